@@ -131,7 +131,12 @@ class Video2PhotoPanel(BasePanel):
     """视频转图片功能面板"""
     def __init__(self, parent=None):
         super(Video2PhotoPanel, self).__init__(parent)
+        # 添加处理方式选择：单个视频或批量处理文件夹中的所有视频
+        self.batchComboBox = QtWidgets.QComboBox()
+        self.batchComboBox.addItems(["单个视频", "批量处理(文件夹)", "单个视频分段并行"])
+        self.layout.addRow("处理方式:", self.batchComboBox)
         self.inputLine = self.add_file_selector("视频文件路径:", None)
+        self.batchDirLine = self.add_dir_selector("视频文件夹路径:", None)
         self.startLine = QtWidgets.QLineEdit()
         self.startLine.setPlaceholderText("整数，例如：0")
         self.layout.addRow("起始编号:", self.startLine)
@@ -139,16 +144,98 @@ class Video2PhotoPanel(BasePanel):
         self.timeFLine.setPlaceholderText("整数，例如：5")
         self.layout.addRow("帧间隔:", self.timeFLine)
 
+        # 添加抽帧模式选择，顺序与 src.Video2Photo.EXTRACT_MODES 对应
+        self.modeComboBox = QtWidgets.QComboBox()
+        self.modeComboBox.addItems(["逐帧解码(read)", "跳帧不解码(grab)", "定位抽帧(seek)", "仅关键帧(key)"])
+        self.modeComboBox.setCurrentIndex(1)
+        self.layout.addRow("抽帧模式:", self.modeComboBox)
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认4，0表示不使用线程池")
+        self.layout.addRow("编码线程数:", self.workersLine)
+        self.processesLine = QtWidgets.QLineEdit()
+        self.processesLine.setPlaceholderText("批量/分段处理时使用，可选，默认CPU核数")
+        self.layout.addRow("进程数:", self.processesLine)
+        self.dedupLine = QtWidgets.QLineEdit()
+        self.dedupLine.setPlaceholderText("可选，0-64，例如：5，留空表示不过滤")
+        self.layout.addRow("近重复过滤阈值:", self.dedupLine)
+        self.rangesLine = QtWidgets.QLineEdit()
+        self.rangesLine.setPlaceholderText("可选，单位秒，例如：10-20, 35.5-40，留空表示整个视频")
+        self.layout.addRow("时间范围:", self.rangesLine)
+
+        # 添加输出选项：格式、质量、尺寸，顺序与 src.Video2Photo.IMAGE_FORMATS 对应
+        self.formatComboBox = QtWidgets.QComboBox()
+        self.formatComboBox.addItems(["JPEG(.jpg)", "PNG(.png)", "WebP(.webp)"])
+        self.layout.addRow("输出格式:", self.formatComboBox)
+        self.qualityLine = QtWidgets.QLineEdit()
+        self.qualityLine.setPlaceholderText("可选，1-100，例如：90，留空使用默认质量")
+        self.layout.addRow("图片质量:", self.qualityLine)
+        self.sizeLine = QtWidgets.QLineEdit()
+        self.sizeLine.setPlaceholderText("可选，例如：1280 表示最长边不超过1280；640x640 表示填充到固定尺寸")
+        self.layout.addRow("输出尺寸:", self.sizeLine)
+
 
 class Json2TxtPanel(BasePanel):
-    """JSON转TXT功能面板（v1和v2共用）"""
-    def __init__(self, parent=None):
+    """JSON转TXT功能面板（v1和v2共用，v2额外支持并行进程数与增量转换）"""
+    def __init__(self, parent=None, show_v2_options=False):
         super(Json2TxtPanel, self).__init__(parent)
         self.inputDirLine = self.add_dir_selector("输入文件夹路径:", None)
         self.outputDirLine = self.add_dir_selector("输出文件夹路径:", None)
         self.mapLine = QtWidgets.QLineEdit()
         self.mapLine.setPlaceholderText('例如: {"car":0, "line":1}')
         self.layout.addRow("类别映射:", self.mapLine)
+        self.workersLine = None
+        self.incrementalCheckBox = None
+        self.hashCheckBox = None
+        self.outputModeComboBox = None
+        if show_v2_options:
+            # 输出模式，顺序与 src.json2txt_v2.OUTPUT_MODES 对应
+            self.outputModeComboBox = QtWidgets.QComboBox()
+            self.outputModeComboBox.addItems(["仅矩形检测框", "多边形/圆形也转为检测框", "分割标注(YOLO-seg)"])
+            self.layout.addRow("输出模式:", self.outputModeComboBox)
+            self.workersLine = QtWidgets.QLineEdit()
+            self.workersLine.setPlaceholderText("可选，默认0表示串行，例如：8")
+            self.layout.addRow("并行进程数:", self.workersLine)
+            self.incrementalCheckBox = QtWidgets.QCheckBox("只转换新增或修改过的文件")
+            self.layout.addRow("增量转换:", self.incrementalCheckBox)
+            self.hashCheckBox = QtWidgets.QCheckBox("同时比对文件内容哈希")
+            self.layout.addRow("内容校验:", self.hashCheckBox)
+
+
+class Coco2TxtPanel(BasePanel):
+    """COCO转TXT功能面板"""
+    def __init__(self, parent=None):
+        super(Coco2TxtPanel, self).__init__(parent)
+        self.inputFileLine = self.add_file_selector("COCO标注文件路径:", None)
+        self.outputDirLine = self.add_dir_selector("输出文件夹路径:", None)
+        self.mapLine = QtWidgets.QLineEdit()
+        self.mapLine.setPlaceholderText('可选，留空按类别id顺序编号，例如: {"car":0, "line":1}')
+        self.layout.addRow("类别映射:", self.mapLine)
+        self.emptyCheckBox = QtWidgets.QCheckBox("为没有标注的图片生成空白标注文件")
+        self.layout.addRow("空白标注:", self.emptyCheckBox)
+
+
+class LabelConvertPanel(BasePanel):
+    """标注格式转换功能面板"""
+    def __init__(self, parent=None):
+        super(LabelConvertPanel, self).__init__(parent)
+        self.inputDirLine = self.add_dir_selector("标注文件夹路径:", None)
+        self.outputDirLine = self.add_dir_selector("输出文件夹路径:", None)
+        # 顺序与 src.label_convert.FORMATS 对应
+        self.srcComboBox = QtWidgets.QComboBox()
+        self.srcComboBox.addItems(["labelme(.json)", "YOLO(.txt)", "Pascal VOC(.xml)"])
+        self.layout.addRow("源格式:", self.srcComboBox)
+        self.dstComboBox = QtWidgets.QComboBox()
+        self.dstComboBox.addItems(["labelme(.json)", "YOLO(.txt)", "Pascal VOC(.xml)"])
+        self.dstComboBox.setCurrentIndex(1)
+        self.layout.addRow("目标格式:", self.dstComboBox)
+        self.mapLine = QtWidgets.QLineEdit()
+        self.mapLine.setPlaceholderText('例如: {"car":0, "line":1}，源格式为YOLO时可留空（读取classes.txt）')
+        self.layout.addRow("类别映射:", self.mapLine)
+        self.imageDirLine = self.add_dir_selector("图片文件夹路径:", None)
+        self.imageDirLine.setPlaceholderText("源格式为YOLO时必填，用于读取图片尺寸")
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认0表示串行，例如：8")
+        self.layout.addRow("并行进程数:", self.workersLine)
 
 
 class CompareFoldersPanel(BasePanel):
@@ -157,6 +244,29 @@ class CompareFoldersPanel(BasePanel):
         super(CompareFoldersPanel, self).__init__(parent)
         self.folder1Line = self.add_dir_selector("文件夹1路径:", None)
         self.folder2Line = self.add_dir_selector("文件夹2路径:", None)
+        # 顺序与 src.CompareFolders.COMPARE_MODES 对应
+        self.modeComboBox = QtWidgets.QComboBox()
+        self.modeComboBox.addItems(["按文件名(不含后缀)", "按文件内容"])
+        self.layout.addRow("比较方式:", self.modeComboBox)
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，按内容比较时计算哈希的线程数，默认8")
+        self.layout.addRow("线程数:", self.workersLine)
+
+
+class FindDuplicatesPanel(BasePanel):
+    """查找重复图片功能面板"""
+    def __init__(self, parent=None):
+        super(FindDuplicatesPanel, self).__init__(parent)
+        self.folderLine = self.add_dir_selector("图片文件夹路径:", None)
+        self.thresholdLine = QtWidgets.QLineEdit()
+        self.thresholdLine.setPlaceholderText("可选，默认4，越大找到的重复越多，建议0-10")
+        self.layout.addRow("相似度阈值:", self.thresholdLine)
+        self.recursiveCheckBox = QtWidgets.QCheckBox("包含子文件夹（可同时检查train与val之间的重复）")
+        self.recursiveCheckBox.setChecked(True)
+        self.layout.addRow("子文件夹:", self.recursiveCheckBox)
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认4")
+        self.layout.addRow("进程数:", self.workersLine)
 
 
 class DatasetSplitPanel(BasePanel):
@@ -174,6 +284,29 @@ class DatasetSplitPanel(BasePanel):
         self.taskComboBox.addItems(["目标检测任务", "目标分类任务"])
         self.layout.addRow("任务类型:", self.taskComboBox)
 
+        # 划分方式，顺序与 src.DatasetSplit.SPLIT_MODES 对应
+        self.splitModeComboBox = QtWidgets.QComboBox()
+        self.splitModeComboBox.addItems(["随机划分", "按类别分层划分(仅目标检测，稀有类别也按比例分配)",
+                                         "按文件名哈希划分(结果固定，可增量添加)"])
+        self.layout.addRow("划分方式:", self.splitModeComboBox)
+
+        self.seedLine = QtWidgets.QLineEdit()
+        self.seedLine.setPlaceholderText("可选，哈希划分的种子，默认0")
+        self.layout.addRow("划分种子:", self.seedLine)
+
+        self.incrementalCheckBox = QtWidgets.QCheckBox("只添加新文件（输出到已有的划分结果中，需使用哈希划分）")
+        self.layout.addRow("", self.incrementalCheckBox)
+
+        # 输出方式，顺序与 src.DatasetSplit.OUTPUT_METHODS 对应
+        self.methodComboBox = QtWidgets.QComboBox()
+        self.methodComboBox.addItems(["复制", "硬链接(同一磁盘，不占额外空间)", "符号链接", "写时复制(reflink，需btrfs/xfs等)",
+                                      "只生成清单(train.txt/val.txt/data.yaml，仅目标检测)"])
+        self.layout.addRow("输出方式:", self.methodComboBox)
+
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认8，0表示单线程")
+        self.layout.addRow("复制线程数:", self.workersLine)
+
 
 class GenerationLabelsPanel(BasePanel):
     """生成标签功能面板"""
@@ -200,8 +333,47 @@ class CheckLabelsPanel(BasePanel):
         super(CheckLabelsPanel, self).__init__(parent)
         self.folderLine = self.add_dir_selector("标注文件夹路径:", None)
         self.classesLine = QtWidgets.QLineEdit()
-        self.classesLine.setPlaceholderText("以逗号分隔，例如：0,1")
+        self.classesLine.setPlaceholderText("以逗号分隔，例如：0,1，留空表示保留所有类别")
         self.layout.addRow("需要保留的类别编号:", self.classesLine)
+        self.remapLine = QtWidgets.QLineEdit()
+        self.remapLine.setPlaceholderText("可选，例如: {3:0, 5:1}")
+        self.layout.addRow("类别编号重映射:", self.remapLine)
+        self.clipCheckBox = QtWidgets.QCheckBox("把超出图片范围的坐标裁剪到 [0, 1]")
+        self.layout.addRow("坐标裁剪:", self.clipCheckBox)
+        self.degenerateCheckBox = QtWidgets.QCheckBox("删除宽或高不大于最小尺寸的框")
+        self.layout.addRow("删除退化框:", self.degenerateCheckBox)
+        self.minSizeLine = QtWidgets.QLineEdit()
+        self.minSizeLine.setPlaceholderText("可选，归一化尺寸，默认0，例如：0.002")
+        self.layout.addRow("最小尺寸:", self.minSizeLine)
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认0表示串行，例如：8")
+        self.layout.addRow("并行进程数:", self.workersLine)
+
+
+class ValidateLabelsPanel(BasePanel):
+    """标注检查功能面板"""
+    def __init__(self, parent=None):
+        super(ValidateLabelsPanel, self).__init__(parent)
+        self.folderLine = self.add_dir_selector("标注文件夹路径:", None)
+        self.iouLine = QtWidgets.QLineEdit()
+        self.iouLine.setPlaceholderText("可选，默认0.9")
+        self.layout.addRow("近似重复IoU阈值:", self.iouLine)
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认0表示串行，例如：8")
+        self.layout.addRow("并行进程数:", self.workersLine)
+
+
+class LabelIndexPanel(BasePanel):
+    """标注统计功能面板"""
+    def __init__(self, parent=None):
+        super(LabelIndexPanel, self).__init__(parent)
+        self.folderLine = self.add_dir_selector("标注文件夹路径:", None)
+        self.classLine = QtWidgets.QLineEdit()
+        self.classLine.setPlaceholderText("可选，列出包含该类别的文件，例如：2")
+        self.layout.addRow("查询类别编号:", self.classLine)
+        self.workersLine = QtWidgets.QLineEdit()
+        self.workersLine.setPlaceholderText("可选，默认0表示串行，例如：8")
+        self.layout.addRow("并行进程数:", self.workersLine)
 
 
 class BatchDeletionPanel(BasePanel):
@@ -274,9 +446,13 @@ class MainWindow(QtWidgets.QWidget):
         annotation_buttons = [
             ("Json2TxtV1", "JSON转TXT(v1)"),
             ("Json2TxtV2", "JSON转TXT(v2)"),
+            ("Coco2Txt", "COCO转TXT"),
+            ("LabelConvert", "标注格式转换"),
             ("GenerationLabels", "生成标注"),
             ("GenerationEmpty", "生成空白标注"),
             ("CheckLabels", "标注清洗"),
+            ("LabelIndex", "标注统计"),
+            ("ValidateLabels", "标注检查"),
             ("MergeLabels", "标注合并")
         ]
         for i, (func_name, display_name) in enumerate(annotation_buttons):
@@ -290,7 +466,8 @@ class MainWindow(QtWidgets.QWidget):
         file_tab = QtWidgets.QWidget()
         file_layout = QtWidgets.QGridLayout()
         file_buttons = [
-            ("BatchDeletion", "批量删除")
+            ("BatchDeletion", "批量删除"),
+            ("FindDuplicates", "查找重复图片")
         ]
         for i, (func_name, display_name) in enumerate(file_buttons):
             btn = QtWidgets.QPushButton(display_name)
@@ -313,12 +490,17 @@ class MainWindow(QtWidgets.QWidget):
         self.panels = {
             "Video2Photo": Video2PhotoPanel(),
             "Json2TxtV1": Json2TxtPanel(),
-            "Json2TxtV2": Json2TxtPanel(),
+            "Json2TxtV2": Json2TxtPanel(show_v2_options=True),
+            "Coco2Txt": Coco2TxtPanel(),
+            "LabelConvert": LabelConvertPanel(),
             "CompareFolders": CompareFoldersPanel(),
+            "FindDuplicates": FindDuplicatesPanel(),
             "DatasetSplit": DatasetSplitPanel(),
             "GenerationLabels": GenerationLabelsPanel(),
             "GenerationEmpty": GenerationEmptyPanel(),
             "CheckLabels": CheckLabelsPanel(),
+            "LabelIndex": LabelIndexPanel(),
+            "ValidateLabels": ValidateLabelsPanel(),
             "BatchDeletion": BatchDeletionPanel(),
             "Rename": RenamePanel(),
             "MergeLabels": MergeLabelsPanel()
@@ -355,14 +537,19 @@ class MainWindow(QtWidgets.QWidget):
 
         # 功能描述
         self.descriptions = {
-            "Video2Photo": "【视频转图片功能】\n读取视频文件，每隔一定帧数提取一帧图片并保存。\n参数：\n- 视频文件路径\n- 起始编号（不包括该数）\n- 帧间隔",
+            "Video2Photo": "【视频转图片功能】\n读取视频文件，每隔一定帧数提取一帧图片并保存。支持批量处理文件夹中的所有视频。\n参数：\n- 处理方式\n- 视频文件路径（批量处理时为视频文件夹路径）\n- 起始编号（不包括该数）\n- 帧间隔\n- 抽帧模式（grab：跳过的帧不解码，输出与逐帧解码一致；seek：直接定位，适合帧间隔很大的长视频；\n  key：只解码关键帧，忽略帧间隔，需要安装PyAV）\n- 编码线程数（可选，解码与编码写盘并行进行）\n- 进程数（批量处理时每个视频的图片保存在 images/视频名/ 下，单个视频失败不影响其余视频；\n  分段并行时单个长视频按帧数切分为多段同时处理，输出与顺序处理一致）\n- 近重复过滤阈值（可选，与上一张保存图片的哈希距离不超过该值的帧将被丢弃，数值越大过滤越多）\n- 时间范围（可选，只抽取这些时间段内的帧，其余部分直接跳过）\n- 输出格式、图片质量、输出尺寸（可选，保存前在内存中缩放，无需再单独缩放一遍）",
             "Json2TxtV1": "【JSON转TXT功能(v1)】\n将输入文件夹中的JSON文件转换为TXT格式。（简化的json版本，如labelme）\n参数：\n- 输入文件夹路径\n- 输出文件夹路径\n- 类别映射",
-            "Json2TxtV2": "【JSON转TXT功能(v2)】\n将输入文件夹中的JSON文件转换为TXT格式。（通用json版本）\n参数：\n- 输入文件夹路径\n- 输出文件夹路径\n- 类别映射",
-            "CompareFolders": "【比较文件夹功能】\n比较两个目录中文件名是否相同，可以用于检验标签文件或图像的丢失。\n支持一键删除多余文件\n参数：\n- 文件夹1路径\n- 文件夹2路径",
-            "DatasetSplit": "【数据集分割功能】\n用于图像分割数据集的制作，将数据集划分为训练集和验证集。\n支持两种任务类型：\n1. 目标检测任务：输入目录需包含 images/ 和 labels/ 文件夹\n2. 目标分类任务：输入目录下每个子文件夹代表一个类别\n参数：\n- 原始数据集路径\n- 输出数据集路径\n- 训练集比例\n- 任务类型\n警告：输出路径应为一个空的目录，请勿选择已存在文件的目录，防止您的宝贵数据丢失！！！",
+            "Json2TxtV2": "【JSON转TXT功能(v2)】\n将输入文件夹中的JSON文件转换为TXT格式。（通用json版本）\n参数：\n- 输入文件夹路径\n- 输出文件夹路径\n- 类别映射\n- 输出模式（仅矩形；多边形/圆形也转为检测框；YOLO分割格式）\n- 并行进程数（可选，大于0时多进程分块转换，警告统一汇总输出）\n- 增量转换（可选，在输出文件夹的 .cache 子文件夹中记录清单，只转换新增或修改过的文件，并删除源文件已不存在的输出）",
+            "Coco2Txt": "【COCO转TXT功能】\n将COCO格式的标注文件（如instances_train2017.json）转换为YOLO格式的TXT文件。\n流式读取，几个GB的标注文件也不会占满内存；iscrowd标注会被跳过，类别名称写入输出文件夹下的classes.txt。\n参数：\n- COCO标注文件路径\n- 输出文件夹路径\n- 类别映射（可选，留空时按类别id顺序编号为0、1、2...）\n- 空白标注（可选）",
+            "LabelConvert": "【标注格式转换功能】\nlabelme(json)、YOLO(txt)、Pascal VOC(xml) 三种检测标注格式之间任意互转。\n参数：\n- 标注文件夹路径\n- 输出文件夹路径\n- 源格式、目标格式\n- 类别映射（源格式为YOLO时可留空，此时使用标注文件夹中的classes.txt作为类别名称）\n- 图片文件夹路径（源格式为YOLO时必填，YOLO标注不含图片尺寸）\n- 并行进程数（可选）",
+            "CompareFolders": "【比较文件夹功能】\n比较两个目录中文件名是否相同，可以用于检验标签文件或图像的丢失。\n支持一键删除多余文件\n按文件内容比较时（包含子文件夹）：先按大小筛选，再并行计算哈希，\n报告同名但内容不同、内容相同但改了名、内容完全重复的文件；哈希缓存在文件夹下的 .cache 子文件夹中，重复比较很快。\n参数：\n- 文件夹1路径\n- 文件夹2路径\n- 比较方式\n- 线程数（可选）",
+            "FindDuplicates": "【查找重复图片功能】\n查找文件夹中缩放、重新压缩或轻微改动过的近似重复图片，按组列出，每组保留文件最大的一张。\n哈希缓存在文件夹下（.cache/phash.json），再次查找只需计算新增或修改过的图片。\n列出结果后可选择一键删除标记的图片；只删除与保留图片本身相似的图片，只经组内其他图片间接相似的图片会保留并提示。\n参数：\n- 图片文件夹路径\n- 相似度阈值（可选，哈希的汉明距离，默认4）\n- 是否包含子文件夹\n- 进程数（可选）\n警告：删除操作无法撤销，请先核对列出的重复组！",
+            "DatasetSplit": "【数据集分割功能】\n用于图像分割数据集的制作，将数据集划分为训练集和验证集。\n支持两种任务类型：\n1. 目标检测任务：输入目录需包含 images/ 和 labels/ 文件夹\n2. 目标分类任务：输入目录下每个子文件夹代表一个类别\n参数：\n- 原始数据集路径\n- 输出数据集路径\n- 训练集比例\n- 任务类型\n- 划分方式（按类别分层划分会读取全部标注，使每个类别的标注都按训练集比例分配，避免稀有类别全部落在训练集或验证集；\n  按文件名哈希划分时每个样本的归属只由种子和文件名决定，多次运行结果相同）\n- 只添加新文件（输出路径为之前用相同种子和比例哈希划分的结果，只复制新增的样本，已有的训练集与验证集不变）\n- 输出方式（链接方式几秒内完成且几乎不占用额外空间，跨磁盘或不支持时自动改为复制；\n  注意硬链接与源文件共享内容，修改其中一个会同时改变另一个；\n  只生成清单时不复制文件，输出 train.txt、val.txt 和 data.yaml，类别名读取 labels/classes.txt）\n- 复制线程数（多线程同时复制，充分利用 NVMe 与网络存储的带宽）\n警告：输出路径应为一个空的目录（只添加新文件时除外），请勿选择已存在文件的目录，防止您的宝贵数据丢失！！！",
             "GenerationLabels": "【生成标注功能】\n用于给所有图片生成相同测试标签。\n参数：\n- 图片文件夹路径\n- 标签输出路径\n- 标签内容",
             "GenerationEmpty": "【生成空白标注功能】\n用于比较两个目录中文件名是否存在对应的标注文件，\n如果第二个目录不包含与第一个目录中同名（不包括后缀）的标注文件，\n则在第二个目录生成一个空白txt文件。\n参数：\n- 图片文件夹路径（文件夹1）\n- 标注文件夹路径（文件夹2）",
-            "CheckLabels": "【标注清洗功能】\n用于清洗YOLO标注文件中的类别编号。\n例如：仅需要0、1类，某个标注文件中包含类别2、4、5的行将被清除，\n仅保留合法的标注数据。\n参数：\n- 标注文件夹路径\n- 需要保留的类别编号（以逗号分隔，例如：0,1）",
+            "CheckLabels": "【标注清洗功能】\n用于清洗YOLO标注文件中的类别编号。\n例如：仅需要0、1类，某个标注文件中包含类别2、4、5的行将被清除，\n仅保留合法的标注数据。所有规则在一次读写中完成，先写临时文件再替换，中途中断不会损坏标注文件。\n参数：\n- 标注文件夹路径\n- 需要保留的类别编号（以逗号分隔，例如：0,1，留空表示保留所有类别）\n- 类别编号重映射（可选，按原编号判断是否保留后再重映射）\n- 坐标裁剪、删除退化框、最小尺寸（可选）\n- 并行进程数（可选）",
+            "LabelIndex": "【标注统计功能】\n统计YOLO标注文件夹中各类别的标注数量、出现的文件数、空白标注文件等。\n首次运行时解析全部标注并在标注文件夹下保存索引（.cache/index.npz），\n之后只重新解析新增或修改过的文件，大数据集也能很快得到结果。\n参数：\n- 标注文件夹路径\n- 查询类别编号（可选，列出包含该类别的文件）\n- 并行进程数（可选）",
+            "ValidateLabels": "【标注检查功能】\n检查YOLO标注文件中的问题：格式错误的行、坐标超出[0, 1]、宽或高为0的框、完全重复的行、\n同类别IoU超过阈值的近似重复框（重复标注）。只检查不修改，完整结果写入标注文件夹下的json报告（.cache/validation.json）。\n参数：\n- 标注文件夹路径\n- 近似重复IoU阈值（可选，默认0.9）\n- 并行进程数（可选）",
             "BatchDeletion": "【批量删除功能】\n用于批量删除指定文件夹中包含特定字符特征的文件。\n参数：\n- 文件夹路径\n- 文件名特征（例如：train, *, ()）\n- 文件后缀（例如：.txt, .jpg）",
             "Rename": "【批量重命名功能】\n用于重命名文件夹中的文件，支持指定后缀或重命名所有文件。\n参数：\n- 文件夹路径\n- 文件后缀（例如：jpg, png，输入all处理所有文件）\n- 起始编号",
             "MergeLabels": "【标注合并功能】\n用于合并两个目录下同名标注文件的内容。\n遍历文件夹1和文件夹2中所有txt文件，对于在两个文件夹中同名的txt文件，\n将文件夹2中的内容合并追加到文件夹1对应的文件中。\n参数：\n- 目标标注文件夹路径（文件夹1）\n- 待合并标注文件夹路径（文件夹2）"
@@ -398,9 +585,14 @@ class MainWindow(QtWidgets.QWidget):
         if not function_name:
             return
 
+        kwargs = {}
         try:
             if function_name == "Video2Photo":
-                video_file = self.panels["Video2Photo"].inputLine.text().strip()
+                run_mode = self.panels["Video2Photo"].batchComboBox.currentIndex()
+                if run_mode == 1:
+                    video_file = self.panels["Video2Photo"].batchDirLine.text().strip()
+                else:
+                    video_file = self.panels["Video2Photo"].inputLine.text().strip()
                 start_str = self.panels["Video2Photo"].startLine.text().strip()
                 timeF_str = self.panels["Video2Photo"].timeFLine.text().strip()
                 if not video_file or not start_str or not timeF_str:
@@ -408,9 +600,75 @@ class MainWindow(QtWidgets.QWidget):
                     return
                 start = int(start_str)
                 timeF = int(timeF_str)
+                workers_str = self.panels["Video2Photo"].workersLine.text().strip()
+                try:
+                    workers = int(workers_str) if workers_str else 4
+                    if workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "编码线程数必须是非负整数！")
+                    return
+                dedup_str = self.panels["Video2Photo"].dedupLine.text().strip()
+                try:
+                    dedup_threshold = int(dedup_str) if dedup_str else None
+                    if dedup_threshold is not None and not 0 <= dedup_threshold <= 64:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "近重复过滤阈值必须是0到64之间的整数！")
+                    return
+                processes_str = self.panels["Video2Photo"].processesLine.text().strip()
+                try:
+                    processes = int(processes_str) if processes_str else None
+                    if processes is not None and processes <= 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "进程数必须是正整数！")
+                    return
+                ranges_str = self.panels["Video2Photo"].rangesLine.text().strip()
+                try:
+                    ranges = [[float(t) for t in r.split('-')] for r in ranges_str.split(',') if r.strip()]
+                    if any(len(r) != 2 or r[0] < 0 or r[1] <= r[0] for r in ranges):
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "时间范围格式错误，请输入如 10-20, 35.5-40 的形式！")
+                    return
+                quality_str = self.panels["Video2Photo"].qualityLine.text().strip()
+                size_str = self.panels["Video2Photo"].sizeLine.text().strip().lower()
+                try:
+                    quality = int(quality_str) if quality_str else None
+                    if quality is not None and not 1 <= quality <= 100:
+                        raise ValueError
+                    max_side, letterbox = None, None
+                    if 'x' in size_str:
+                        letterbox = tuple(int(v) for v in size_str.split('x'))
+                        if len(letterbox) != 2 or min(letterbox) <= 0:
+                            raise ValueError
+                    elif size_str:
+                        max_side = int(size_str)
+                        if max_side <= 0:
+                            raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "图片质量须为1到100的整数，输出尺寸须为正整数或 宽x高 形式！")
+                    return
                 module = importlib.import_module("src.Video2Photo")
-                func = module.main
-                args = (video_file, start, timeF)
+                mode = module.EXTRACT_MODES[self.panels["Video2Photo"].modeComboBox.currentIndex()]
+                img_format = module.IMAGE_FORMATS[self.panels["Video2Photo"].formatComboBox.currentIndex()]
+                save_kwargs = {"img_format": img_format, "quality": quality, "max_side": max_side, "letterbox": letterbox}
+                if run_mode == 2 and (dedup_threshold is not None or ranges or mode == 'key'):
+                    QtWidgets.QMessageBox.warning(self, "警告", "分段并行模式不支持近重复过滤、时间范围和关键帧模式，请改用单个视频模式！")
+                    return
+                if run_mode == 1:
+                    func = module.batch_main
+                    args = (video_file, start, timeF, mode, processes, workers)
+                    kwargs = {"dedup_threshold": dedup_threshold, "ranges": ranges or None, **save_kwargs}
+                elif run_mode == 2:
+                    func = module.segment_main
+                    args = (video_file, start, timeF, mode, processes, workers)
+                    kwargs = save_kwargs
+                else:
+                    func = module.main
+                    args = (video_file, start, timeF, mode, workers)
+                    kwargs = {"dedup_threshold": dedup_threshold, "ranges": ranges or None, **save_kwargs}
 
             elif function_name in ["Json2TxtV1", "Json2TxtV2"]:
                 input_dir = self.panels[function_name].inputDirLine.text().strip()
@@ -427,16 +685,109 @@ class MainWindow(QtWidgets.QWidget):
                 module = importlib.import_module(f"src.{function_name.lower()}")
                 func = module.main
                 args = (input_dir, output_dir, label_map)
+                if self.panels[function_name].workersLine is not None:
+                    workers_str = self.panels[function_name].workersLine.text().strip()
+                    try:
+                        workers = int(workers_str) if workers_str else 0
+                        if workers < 0:
+                            raise ValueError
+                    except ValueError:
+                        QtWidgets.QMessageBox.warning(self, "警告", "并行进程数必须是非负整数！")
+                        return
+                    args = (input_dir, output_dir, label_map, workers)
+                    kwargs = {"incremental": self.panels[function_name].incrementalCheckBox.isChecked(),
+                              "use_hash": self.panels[function_name].hashCheckBox.isChecked(),
+                              "output_mode": module.OUTPUT_MODES[self.panels[function_name].outputModeComboBox.currentIndex()]}
+
+            elif function_name == "Coco2Txt":
+                coco_json = self.panels["Coco2Txt"].inputFileLine.text().strip()
+                output_dir = self.panels["Coco2Txt"].outputDirLine.text().strip()
+                map_str = self.panels["Coco2Txt"].mapLine.text().strip()
+                if not coco_json or not output_dir:
+                    QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
+                    return
+                try:
+                    label_map = ast.literal_eval(map_str) if map_str else None
+                except Exception:
+                    QtWidgets.QMessageBox.warning(self, "警告", "类别映射格式错误！")
+                    return
+                module = importlib.import_module("src.coco2txt")
+                func = module.main
+                args = (coco_json, output_dir, label_map, self.panels["Coco2Txt"].emptyCheckBox.isChecked())
+
+            elif function_name == "LabelConvert":
+                panel = self.panels["LabelConvert"]
+                input_dir = panel.inputDirLine.text().strip()
+                output_dir = panel.outputDirLine.text().strip()
+                map_str = panel.mapLine.text().strip()
+                image_dir = panel.imageDirLine.text().strip() or None
+                module = importlib.import_module("src.label_convert")
+                formats = list(module.FORMATS)
+                src_format = formats[panel.srcComboBox.currentIndex()]
+                dst_format = formats[panel.dstComboBox.currentIndex()]
+                if not input_dir or not output_dir:
+                    QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
+                    return
+                if src_format == dst_format:
+                    QtWidgets.QMessageBox.warning(self, "警告", "源格式与目标格式相同！")
+                    return
+                if src_format != "yolo" and not map_str:
+                    QtWidgets.QMessageBox.warning(self, "警告", "源格式不是YOLO时必须填写类别映射！")
+                    return
+                if src_format == "yolo" and not image_dir:
+                    QtWidgets.QMessageBox.warning(self, "警告", "源格式为YOLO时必须填写图片文件夹路径！")
+                    return
+                try:
+                    label_map = ast.literal_eval(map_str) if map_str else None
+                except Exception:
+                    QtWidgets.QMessageBox.warning(self, "警告", "类别映射格式错误！")
+                    return
+                workers_str = panel.workersLine.text().strip()
+                try:
+                    workers = int(workers_str) if workers_str else 0
+                    if workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "并行进程数必须是非负整数！")
+                    return
+                func = module.main
+                args = (input_dir, output_dir, src_format, dst_format, label_map, image_dir, workers)
 
             elif function_name == "CompareFolders":
-                folder1 = self.panels["CompareFolders"].folder1Line.text().strip()
-                folder2 = self.panels["CompareFolders"].folder2Line.text().strip()
+                panel = self.panels["CompareFolders"]
+                folder1 = panel.folder1Line.text().strip()
+                folder2 = panel.folder2Line.text().strip()
                 if not folder1 or not folder2:
                     QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
                     return
+                try:
+                    workers = int(panel.workersLine.text().strip() or 8)
+                    if workers <= 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "线程数必须是正整数！")
+                    return
                 module = importlib.import_module("src.CompareFolders")
                 func = module.main
-                args = (folder1, folder2)
+                args = (folder1, folder2, module.COMPARE_MODES[panel.modeComboBox.currentIndex()], workers)
+
+            elif function_name == "FindDuplicates":
+                panel = self.panels["FindDuplicates"]
+                folder_path = panel.folderLine.text().strip()
+                if not folder_path:
+                    QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
+                    return
+                try:
+                    threshold = int(panel.thresholdLine.text().strip() or 4)
+                    workers = int(panel.workersLine.text().strip() or 4)
+                    if threshold < 0 or workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "相似度阈值与进程数必须是非负整数！")
+                    return
+                module = importlib.import_module("src.FindDuplicates")
+                func = module.main
+                args = (folder_path, threshold, panel.recursiveCheckBox.isChecked(), workers)
 
             elif function_name == "DatasetSplit":
                 input_dir = self.panels["DatasetSplit"].inputDirLine.text().strip()
@@ -453,9 +804,20 @@ class MainWindow(QtWidgets.QWidget):
                 except ValueError:
                     QtWidgets.QMessageBox.warning(self, "警告", "训练集比例必须在0到1之间！")
                     return
+                try:
+                    workers = int(self.panels["DatasetSplit"].workersLine.text().strip() or 8)
+                    if workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "线程数必须是非负整数！")
+                    return
                 module = importlib.import_module("src.DatasetSplit")
                 func = module.main
-                args = (input_dir, output_dir, ratio, str(task_index))
+                method = module.OUTPUT_METHODS[self.panels["DatasetSplit"].methodComboBox.currentIndex()]
+                split_mode = module.SPLIT_MODES[self.panels["DatasetSplit"].splitModeComboBox.currentIndex()]
+                seed = self.panels["DatasetSplit"].seedLine.text().strip() or "0"
+                incremental = self.panels["DatasetSplit"].incrementalCheckBox.isChecked()
+                args = (input_dir, output_dir, ratio, str(task_index), method, workers, split_mode, seed, incremental)
 
             elif function_name == "GenerationLabels":
                 input_dir = self.panels["GenerationLabels"].inputDirLine.text().strip()
@@ -479,19 +841,75 @@ class MainWindow(QtWidgets.QWidget):
                 args = (folder1, folder2)
 
             elif function_name == "CheckLabels":
-                folder_path = self.panels["CheckLabels"].folderLine.text().strip()
-                classes_str = self.panels["CheckLabels"].classesLine.text().strip()
-                if not folder_path or not classes_str:
-                    QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
+                panel = self.panels["CheckLabels"]
+                folder_path = panel.folderLine.text().strip()
+                classes_str = panel.classesLine.text().strip()
+                remap_str = panel.remapLine.text().strip()
+                clip = panel.clipCheckBox.isChecked()
+                drop_degenerate = panel.degenerateCheckBox.isChecked()
+                if not folder_path or not (classes_str or remap_str or clip or drop_degenerate):
+                    QtWidgets.QMessageBox.warning(self, "警告", "请填写文件夹路径，并至少设置一项清洗规则！")
                     return
                 try:
-                    valid_classes = [int(cls.strip()) for cls in classes_str.split(',') if cls.strip() != '']
+                    valid_classes = [int(cls.strip()) for cls in classes_str.split(',') if cls.strip() != ''] if classes_str else None
                 except ValueError:
                     QtWidgets.QMessageBox.warning(self, "警告", "类别编号格式不正确，请输入数字并以逗号分隔！")
                     return
+                try:
+                    remap = ast.literal_eval(remap_str) if remap_str else None
+                    if remap is not None and not (isinstance(remap, dict) and all(isinstance(k, int) and isinstance(v, int) for k, v in remap.items())):
+                        raise ValueError
+                except Exception:
+                    QtWidgets.QMessageBox.warning(self, "警告", "类别编号重映射格式错误！")
+                    return
+                try:
+                    min_size = float(panel.minSizeLine.text().strip() or 0)
+                    workers = int(panel.workersLine.text().strip() or 0)
+                    if min_size < 0 or workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "最小尺寸与并行进程数必须是非负数！")
+                    return
                 module = importlib.import_module("src.CheckLabels")
                 func = module.main
-                args = (folder_path, valid_classes)
+                args = (folder_path, valid_classes, remap, clip, drop_degenerate, min_size, workers)
+
+            elif function_name == "LabelIndex":
+                panel = self.panels["LabelIndex"]
+                folder_path = panel.folderLine.text().strip()
+                if not folder_path:
+                    QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
+                    return
+                try:
+                    class_str = panel.classLine.text().strip()
+                    class_id = int(class_str) if class_str else None
+                    workers = int(panel.workersLine.text().strip() or 0)
+                    if workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "类别编号与并行进程数必须是整数！")
+                    return
+                module = importlib.import_module("src.LabelIndex")
+                func = module.main
+                args = (folder_path, class_id, workers)
+
+            elif function_name == "ValidateLabels":
+                panel = self.panels["ValidateLabels"]
+                folder_path = panel.folderLine.text().strip()
+                if not folder_path:
+                    QtWidgets.QMessageBox.warning(self, "警告", "请填写所有参数！")
+                    return
+                try:
+                    iou_threshold = float(panel.iouLine.text().strip() or 0.9)
+                    workers = int(panel.workersLine.text().strip() or 0)
+                    if not 0 < iou_threshold <= 1 or workers < 0:
+                        raise ValueError
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "警告", "IoU阈值应在0-1之间，并行进程数必须是非负整数！")
+                    return
+                module = importlib.import_module("src.ValidateLabels")
+                func = module.main
+                args = (folder_path, iou_threshold, workers)
 
             elif function_name == "BatchDeletion":
                 input_dir = self.panels["BatchDeletion"].inputDirLine.text().strip()
@@ -533,7 +951,7 @@ class MainWindow(QtWidgets.QWidget):
                 args = (folder1, folder2)
 
             self.output_text.append("开始执行...\n")
-            self.worker = Worker(func, args)
+            self.worker = Worker(func, args, kwargs)
             self.worker.output_signal.connect(self.append_output)
             self.worker.error_signal.connect(self.append_output)
             self.worker.input_request_signal.connect(self.handle_input_request)
@@ -1,52 +1,215 @@
 """
-v1.1
+v1.2
 用于清洗YOLO标注文件中的类别编号
 例如：仅需要0、1类，某个标注文件中包含类别2、4、5的行将被清除，仅保留合法的标注数据。
+v1.2: 新增规则化重写，一次读写同时完成 类别过滤、类别编号重映射、坐标裁剪到 [0, 1]、删除退化框；
+      类别查找使用集合/字典，坐标在每个文件内用 NumPy 数组统一处理；
+      支持多进程并行；写入先写临时文件再原子替换，中途崩溃不会留下被截断的标注文件
 """
 import os
+from collections import Counter
+import numpy as np
 
+try:
+    from .batch_jobs import map_chunks
+    from .atomic_file import atomic_write
+except ImportError:
+    # 直接运行本文件时
+    from batch_jobs import map_chunks
+    from atomic_file import atomic_write
 
-def clean_labels(folder_path, valid_classes):
+# 汇总报告中各项统计的说明
+STAT_KINDS = {
+    'invalid': "格式错误的行（已删除）",
+    'filtered': "类别不在保留列表中的行（已删除）",
+    'remapped': "类别编号被重映射的行",
+    'clipped': "坐标被裁剪到 [0, 1] 的行",
+    'degenerate': "宽或高不大于最小尺寸的退化框（已删除）",
+}
+
+
+def make_rules(valid_classes=None, remap=None, clip=False, drop_degenerate=False, min_size=0.0):
     """
-    遍历指定文件夹中的所有txt文件，逐行检查类标签，
-    只保留在 valid_classes 列表中的标注行，其它行将被删除。
+    组合重写规则，按以下顺序作用于每一行：
+    valid_classes 为 None 时保留所有类别，否则只保留其中的类别（按原始编号判断）；
+    remap 为 {原编号: 新编号}，不在其中的编号保持不变；
+    clip 为 True 时把检测框/多边形坐标裁剪到 [0, 1]；
+    drop_degenerate 为 True 时删除宽或高不大于 min_size（归一化）的框。
     """
-    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-        print(f"错误: {folder_path} 不是有效的文件夹路径。")
-        return
+    return {
+        'keep': None if valid_classes is None else set(valid_classes),
+        'remap': dict(remap or {}),
+        'clip': clip,
+        'drop_degenerate': drop_degenerate,
+        'min_size': min_size,
+    }
 
-    file_list = [f for f in os.listdir(folder_path) if f.endswith('.txt') and os.path.isfile(os.path.join(folder_path, f))]
 
-    for file_name in file_list:
-        file_path = os.path.join(folder_path, file_name)
+def format_line(class_id, coords):
+    return f"{class_id} " + " ".join(f"{v:.6f}" for v in coords) + "\n"
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
 
-        valid_lines = []
-        for line in lines:
-            parts = line.strip().split()
-            if not parts:
-                continue
+def apply_rules(lines, rules):
+    """对一个文件的所有行应用规则，返回 (新的行列表, 统计)；未被改动的行保留原文"""
+    keep, remap = rules['keep'], rules['remap']
+    geometry = rules['clip'] or rules['drop_degenerate']
+    stats = Counter()
+    rows = []  # [原行, 新类别编号, 坐标列表, 类别编号是否改动, 坐标是否改动]
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            stats['blank'] += 1
+            continue
+        try:
+            class_id = int(parts[0])
+            coords = [float(v) for v in parts[1:]] if geometry else None
+        except ValueError:
+            # 类别标签不是整数（或坐标不是数字）的行自动忽略
+            stats['invalid'] += 1
+            continue
+        if keep is not None and class_id not in keep:
+            stats['filtered'] += 1
+            continue
+        new_id = remap.get(class_id, class_id)
+        if new_id != class_id:
+            stats['remapped'] += 1
+        rows.append([line, new_id, coords, new_id != class_id, False])
+
+    if geometry:
+        rows = _apply_geometry(rows, rules, stats)
+
+    new_lines = []
+    for line, class_id, coords, remapped, moved in rows:
+        if moved:
+            new_lines.append(format_line(class_id, coords))
+        elif not remapped:
+            new_lines.append(line)
+        else:
+            # 只改了类别编号，坐标保留原文（不经过 format_line，避免损失精度）
+            new_lines.append(f"{class_id} " + " ".join(line.split()[1:]) + "\n")
+    return new_lines, stats
+
+
+def _apply_geometry(rows, rules, stats):
+    """检测框行统一放进 (N, 4) 数组裁剪、判断退化；多边形行逐行处理；其余格式的行不做几何处理"""
+    clip, drop, min_size = rules['clip'], rules['drop_degenerate'], rules['min_size']
+    boxes_idx = [i for i, row in enumerate(rows) if len(row[2]) == 4]
+    dropped = set()
+
+    if boxes_idx:
+        cxcywh = np.array([rows[i][2] for i in boxes_idx], dtype=np.float64)
+        half = cxcywh[:, 2:] / 2.0
+        xyxy = np.hstack([cxcywh[:, :2] - half, cxcywh[:, :2] + half])
+        if clip:
+            clipped = np.clip(xyxy, 0.0, 1.0)
+            changed = (clipped != xyxy).any(axis=1)
+            xyxy = clipped
+            new_boxes = np.hstack([(xyxy[:, :2] + xyxy[:, 2:]) / 2.0, xyxy[:, 2:] - xyxy[:, :2]])
+            for k in np.flatnonzero(changed).tolist():
+                row = rows[boxes_idx[k]]
+                row[2], row[4] = new_boxes[k].tolist(), True
+                stats['clipped'] += 1
+        if drop:
+            sizes = xyxy[:, 2:] - xyxy[:, :2]
+            degenerate = (sizes <= min_size).any(axis=1)
+            dropped.update(boxes_idx[k] for k in np.flatnonzero(degenerate).tolist())
+
+    for i, row in enumerate(rows):
+        coords = row[2]
+        if len(coords) < 6 or len(coords) % 2:
+            continue
+        pts = np.array(coords, dtype=np.float64).reshape(-1, 2)
+        if clip:
+            clipped = np.clip(pts, 0.0, 1.0)
+            if (clipped != pts).any():
+                pts = clipped
+                row[2], row[4] = pts.ravel().tolist(), True
+                stats['clipped'] += 1
+        if drop and ((pts.max(axis=0) - pts.min(axis=0)) <= min_size).any():
+            dropped.add(i)
+
+    stats['degenerate'] += len(dropped)
+    return [row for i, row in enumerate(rows) if i not in dropped]
+
+
+def rewrite_label_file(file_path, rules):
+    """按规则重写单个标注文件，仅在有修改时写入，返回 (是否修改, 保留行数, 统计)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    new_lines, stats = apply_rules(lines, rules)
+    changed = new_lines != lines
+    if changed:
+        atomic_write(file_path, new_lines)
+    return changed, len(new_lines), stats
+
+
+def _rewrite_chunk(paths, rules):
+    """子进程入口：重写一块文件，返回 (修改过的文件数, 统计, [(文件, 错误信息)])"""
+    changed, stats, errors = 0, Counter(), []
+    for file_path in paths:
+        try:
+            file_changed, _, file_stats = rewrite_label_file(file_path, rules)
+            changed += file_changed
+            stats.update(file_stats)
+        except Exception as e:
+            errors.append((file_path, str(e)))
+    return changed, stats, errors
+
+
+def rewrite_labels(folder_path, rules, workers=0, chunk_size=256, verbose=True):
+    """
+    对文件夹中所有 txt 标注文件应用规则，返回 (文件总数, 修改过的文件数, 统计, 错误列表)。
+    workers 为 0 时串行处理，verbose 为 True 时逐个文件打印结果；
+    大于 0 时按 chunk_size 分块交给多个进程处理，结束后统一汇总。
+    """
+    file_list = [f for f in os.listdir(folder_path) if f.endswith('.txt') and os.path.isfile(os.path.join(folder_path, f))]
+    paths = [os.path.join(folder_path, f) for f in file_list]
+
+    if workers <= 0:
+        changed, stats, errors = 0, Counter(), []
+        for file_name, file_path in zip(file_list, paths):
             try:
-                class_id = int(parts[0])
-                if class_id in valid_classes:
-                    valid_lines.append(line)
-            except ValueError:
-                # 类别标签不是整数的行自动忽略
+                file_changed, kept, file_stats = rewrite_label_file(file_path, rules)
+            except Exception as e:
+                errors.append((file_path, str(e)))
                 continue
+            changed += file_changed
+            stats.update(file_stats)
+            if verbose:
+                print(f"已清洗: {file_name}，保留 {kept} 行" if file_changed else f"无变化: {file_name}")
+        return len(paths), changed, stats, errors
 
-        # 仅在有修改时才重写文件
-        if len(valid_lines) != len(lines):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(valid_lines)
-            print(f"已清洗: {file_name}，保留 {len(valid_lines)} 行")
-        else:
-            print(f"无变化: {file_name}")
+    changed, stats, errors = 0, Counter(), []
+    for chunk_changed, chunk_stats, chunk_errors in map_chunks(_rewrite_chunk, paths, workers, chunk_size, (rules,)):
+        changed += chunk_changed
+        stats.update(chunk_stats)
+        errors.extend(chunk_errors)
+    return len(paths), changed, stats, errors
 
 
-def main(folder_path, valid_classes):
-    clean_labels(folder_path, valid_classes)
+def clean_labels(folder_path, valid_classes):
+    """
+    遍历指定文件夹中的所有txt文件，逐行检查类标签，
+    只保留在 valid_classes 列表中的标注行，其它行将被删除。
+    """
+    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+        print(f"错误: {folder_path} 不是有效的文件夹路径。")
+        return
+    rewrite_labels(folder_path, make_rules(valid_classes))
+
+
+def main(folder_path, valid_classes, remap=None, clip=False, drop_degenerate=False, min_size=0.0, workers=0):
+    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+        print(f"错误: {folder_path} 不是有效的文件夹路径。")
+        return
+    rules = make_rules(valid_classes, remap, clip, drop_degenerate, min_size)
+    total, changed, stats, errors = rewrite_labels(folder_path, rules, workers)
+    for file_path, message in errors:
+        print(f"处理失败：{file_path}，{message}")
+    print(f"处理完成：共 {total} 个文件，修改 {changed} 个，失败 {len(errors)} 个")
+    for kind, desc in STAT_KINDS.items():
+        if stats[kind]:
+            print(f"  {desc}：{stats[kind]}")
 
 
 if __name__ == "__main__":
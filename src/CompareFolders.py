@@ -1,32 +1,68 @@
 """
-v1.0
+v1.4
 用于比较两个目录中文件名是否相同，可以用于检验标签文件或图像的丢失，支持一键删除多余文件
+v1.1: 每个文件夹只读取一次目录，建立 主文件名 -> 文件名 索引，查找多余文件的路径不再对每个文件重新 listdir；
+      同一主文件名对应多个文件时（如 a.jpg 与 a.png）全部列出
+v1.2: 新增按内容比较模式：先按文件大小筛选，只有大小相同的文件才需要计算哈希，哈希由线程池按大块并行读取计算，
+      报告同名但内容不同、内容相同但改了名、内容完全重复的文件；
+      哈希按 (路径, 大小, 修改时间) 缓存在文件夹旁（<文件夹>.hashes.json），重复比较几乎不需要再读文件。
+      安装了 xxhash 时使用 xxh3_128（可选），否则使用 blake2b
+v1.3: 哈希缓存移到文件夹内的 .cache/hashes.json，不再写入上级目录，扫描时跳过 .cache，两个文件夹嵌套时缓存不会被当作数据
+v1.4: 按内容比较时"仅在一侧存在"按哈希判断，内容在另一侧任意路径下存在的文件不再列入
 """
 import os
+import json
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from .stem_index import build_stem_index, iter_files, cache_path
+    from .atomic_file import atomic_save_json
+except ImportError:
+    # 直接运行本文件时
+    from stem_index import build_stem_index, iter_files, cache_path
+    from atomic_file import atomic_save_json
+
+# 比较模式：按主文件名 / 按文件内容
+COMPARE_MODES = ('name', 'content')
+
+# 计算哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 4 << 20
+
+HASH_ALGORITHM = 'xxh3_128' if xxhash is not None else 'blake2b'
 
-def get_file_names(folder_path):
 
+def get_stem_index(folder_path):
+    """读取文件夹的 主文件名 -> 文件名列表 索引，路径无效时返回空字典"""
     if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
         print(f"错误: {folder_path} 不是有效的文件夹路径。")
-        return set()
+        return {}
+    return build_stem_index(folder_path)
 
-    return {os.path.splitext(file)[0] for file in os.listdir(folder_path) if
-            os.path.isfile(os.path.join(folder_path, file))}
 
+def get_file_names(folder_path):
+
+    return set(get_stem_index(folder_path))
 
-def confirm_and_delete(folder_path, extra_files):
+
+def confirm_and_delete(folder_path, extra_files, stem_index=None):
 
     if not extra_files:
         return
 
+    if stem_index is None:
+        stem_index = build_stem_index(folder_path)
     print(f"以下文件仅在 {folder_path} 中存在:")
     file_paths = []
-    for file_name in extra_files:
-        for f in os.listdir(folder_path):
-            if os.path.splitext(f)[0] == file_name:
-                file_paths.append(os.path.join(folder_path, f))
-                break
+    for file_name in sorted(extra_files):
+        for f in stem_index.get(file_name, []):
+            file_paths.append(os.path.join(folder_path, f))
 
     print("\n".join(file_paths))
     confirm = input("是否删除以上所有文件？(y/n): ")
@@ -40,8 +76,10 @@ def confirm_and_delete(folder_path, extra_files):
 
 def compare_folders(folder1, folder2):
     """比较两个文件夹的文件名，并处理多余文件"""
-    files1 = get_file_names(folder1)
-    files2 = get_file_names(folder2)
+    index1 = get_stem_index(folder1)
+    index2 = get_stem_index(folder2)
+    files1 = set(index1)
+    files2 = set(index2)
 
     common_files = files1 & files2  # 交集，两个文件夹都存在的文件
     extra_in_folder1 = files1 - files2  # 仅在 folder1 中的文件
@@ -53,14 +91,170 @@ def compare_folders(folder1, folder2):
 
     # 处理额外文件
     if extra_in_folder1:
-        confirm_and_delete(folder1, extra_in_folder1)
+        confirm_and_delete(folder1, extra_in_folder1, index1)
 
     if extra_in_folder2:
-        confirm_and_delete(folder2, extra_in_folder2)
+        confirm_and_delete(folder2, extra_in_folder2, index2)
+
+
+# ------------------ 按内容比较 ------------------
+def hash_file(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """按大块读取文件计算哈希"""
+    h = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_cache_path(folder_path):
+    """哈希缓存保存在文件夹下：<文件夹>/.cache/hashes.json"""
+    return cache_path(folder_path, 'hashes.json')
+
+
+def load_hash_cache(folder_path):
+    """读取哈希缓存 {相对路径: [大小, 修改时间ns, 哈希]}，不存在、损坏或哈希算法不同时返回空字典"""
+    try:
+        with open(hash_cache_path(folder_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('algorithm') != HASH_ALGORITHM:
+            return {}
+        return data.get('files', {})
+    except (OSError, ValueError):
+        return {}
+
 
+def save_hash_cache(folder_path, files):
+    atomic_save_json(hash_cache_path(folder_path), {'algorithm': HASH_ALGORITHM, 'files': files})
 
-def main(folder1, folder2):
-    compare_folders(folder1, folder2)
+
+def scan_files(folder_path, recursive=True, extensions=None):
+    """{相对路径: (大小, 修改时间ns)}，默认包含子文件夹；extensions 为后缀列表时只统计这些后缀的文件"""
+    files = {}
+    for rel_path, _ in iter_files(folder_path, recursive, extensions):
+        try:
+            st = os.stat(os.path.join(folder_path, rel_path))
+        except OSError:  # 扫描期间被删除等
+            continue
+        files[rel_path] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def hash_files(folder_path, files, rel_paths, cache, workers=8):
+    """
+    计算 rel_paths 中文件的哈希，大小与修改时间都与缓存一致的直接使用缓存，其余由线程池并行计算。
+    返回 ({相对路径: 哈希}, 实际计算的文件数)，cache 会被更新。
+    """
+    digests, todo = {}, []
+    for rel_path in rel_paths:
+        size, mtime = files[rel_path]
+        cached = cache.get(rel_path)
+        if cached is not None and cached[0] == size and cached[1] == mtime:
+            digests[rel_path] = cached[2]
+        else:
+            todo.append(rel_path)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for rel_path, digest in zip(todo, executor.map(lambda p: hash_file(os.path.join(folder_path, p)), todo)):
+            digests[rel_path] = digest
+            cache[rel_path] = [files[rel_path][0], files[rel_path][1], digest]
+    return digests, len(todo)
+
+
+def compare_contents(folder1, folder2, workers=8):
+    """
+    按内容比较两个文件夹（包含子文件夹，按相对路径配对），返回报告字典：
+    modified   : 两边都有但内容不同的文件
+    renamed    : 内容相同但文件名不同的 (文件夹1中的文件, 文件夹2中的文件)
+    duplicates : 同一文件夹内内容完全相同的文件组（[(文件夹序号, 相对路径), ...]，另一侧的相同文件一并列出）
+    only1/only2: 仅在一侧存在的文件：路径只在这一侧，且另一侧任何路径下都没有相同内容
+                 （内容在另一侧存在、但没有一一配对为 renamed 的多余副本会出现在 duplicates 中）
+    """
+    folders = (folder1, folder2)
+    files = [scan_files(folder) for folder in folders]
+
+    # 只有大小与其他文件相同的文件才可能内容相同，其余文件不需要计算哈希
+    size_count = defaultdict(int)
+    for side in files:
+        for size, _ in side.values():
+            size_count[size] += 1
+    digests, hashed = [], 0
+    for folder, side in zip(folders, files):
+        cache = load_hash_cache(folder)
+        candidates = [rel for rel, (size, _) in side.items() if size_count[size] > 1]
+        side_digests, side_hashed = hash_files(folder, side, candidates, cache, workers)
+        # 缓存中只保留仍然存在的文件
+        save_hash_cache(folder, {rel: entry for rel, entry in cache.items() if rel in side})
+        digests.append(side_digests)
+        hashed += side_hashed
+
+    common = files[0].keys() & files[1].keys()
+    modified = sorted(rel for rel in common
+                      if files[0][rel][0] != files[1][rel][0] or digests[0].get(rel) != digests[1].get(rel))
+
+    by_digest = defaultdict(list)
+    for side, side_digests in enumerate(digests):
+        for rel, digest in side_digests.items():
+            by_digest[digest].append((side, rel))
+    # 同一文件夹内至少有两个文件内容相同的组（另一侧的相同文件一并列出）
+    duplicates = sorted(sorted(group) for group in by_digest.values()
+                        if max(sum(1 for side, _ in group if side == k) for k in (0, 1)) > 1)
+
+    only1 = files[0].keys() - files[1].keys()
+    only2 = files[1].keys() - files[0].keys()
+    renamed = []
+    for group in by_digest.values():
+        left = sorted(rel for side, rel in group if side == 0 and rel in only1)
+        right = sorted(rel for side, rel in group if side == 1 and rel in only2)
+        renamed.extend(zip(left, right))
+    # 是否仅在一侧存在按哈希判断：另一侧任意路径下有相同内容的文件都不算
+    contents = [set(side_digests.values()) for side_digests in digests]
+
+    return {
+        'total': (len(files[0]), len(files[1])),
+        'identical': len(common) - len(modified),
+        'modified': modified,
+        'renamed': sorted(renamed),
+        'duplicates': duplicates,
+        'only1': sorted(rel for rel in only1 if digests[0].get(rel) not in contents[1]),
+        'only2': sorted(rel for rel in only2 if digests[1].get(rel) not in contents[0]),
+        'hashed': hashed,
+    }
+
+
+def print_content_report(folder1, folder2, report, limit=20):
+    folders = (folder1, folder2)
+
+    def print_list(title, items, fmt):
+        print(f"{title}：{len(items)} 个")
+        for item in items[:limit]:
+            print(f"  {fmt(item)}")
+        if len(items) > limit:
+            print(f"  ……其余 {len(items) - limit} 个省略")
+
+    print(f"{folder1} 中共 {report['total'][0]} 个文件，{folder2} 中共 {report['total'][1]} 个文件，"
+          f"本次实际计算哈希 {report['hashed']} 个（其余按大小排除或使用缓存）。")
+    print(f"同名且内容相同：{report['identical']} 个")
+    print_list("同名但内容不同", report['modified'], lambda rel: rel)
+    print_list("内容相同但文件名不同", report['renamed'], lambda pair: f"{pair[0]}  <->  {pair[1]}")
+    print_list("内容完全重复的文件组", report['duplicates'],
+               lambda group: "  =  ".join(os.path.join(folders[side], rel) for side, rel in group))
+    print_list(f"仅在 {folder1} 中存在（另一侧也没有相同内容）", report['only1'], lambda rel: rel)
+    print_list(f"仅在 {folder2} 中存在（另一侧也没有相同内容）", report['only2'], lambda rel: rel)
+
+
+def main(folder1, folder2, mode='name', workers=8):
+    if mode == 'content':
+        for folder_path in (folder1, folder2):
+            if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+                print(f"错误: {folder_path} 不是有效的文件夹路径。")
+                return
+        report = compare_contents(folder1, folder2, workers)
+        print_content_report(folder1, folder2, report)
+    else:
+        compare_folders(folder1, folder2)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 """
-v1.2
+v1.8
 用于数据集制作，支持目标检测和目标分类任务。
 
 目标检测任务：
@@ -35,10 +35,106 @@ output/
     │   └── ...
     └── class2/
         └── ...
+
+v1.3: 目标检测任务中图像与标注的配对改为各读取一次目录建立索引，不再对每个图像单独判断标注文件是否存在
+v1.4: 新增链接模式：硬链接、符号链接、写时复制(reflink)，几秒内完成划分且几乎不占用额外空间，
+      跨磁盘或文件系统不支持时自动退回复制
+v1.5: 新增只生成划分清单的方式（仅目标检测）：输出 train.txt、val.txt（图像绝对路径列表）和 data.yaml，不复制任何文件，
+      类别名读取 labels/classes.txt，没有时按标注中的类别编号生成；重新划分只需读取一次目录，同一数据集可保留多份划分
+v1.6: 文件改由线程池并行复制（见 parallel_copy），使用内核的快速复制，完成后输出每秒文件数与传输速度
+v1.7: 目标检测新增按类别分层划分：标注经 LabelIndex 并行解析并缓存，按多标签迭代分层分配图像，
+      稀有类别不会全部落在训练集或验证集，各类别标注数的训练集占比接近设定比例
+v1.8: 新增按文件名哈希划分：blake2b(种子 + 主文件名) 决定每个样本的归属，与文件顺序和数量无关，多次运行结果相同；
+      新增只添加新文件（增量）模式：输出目录可以是之前的划分结果，每个目标文件夹只读取一次目录，
+      只复制尚不存在的新样本，已有样本与验证集保持不变
 """
 import os
-import shutil
+import json
 import random
+import hashlib
+import numpy as np
+
+try:
+    from .stem_index import iter_files, CACHE_DIR
+    from .parallel_copy import copy_file, parallel_transfer, print_transfer_stats
+    from .label_convert import CLASSES_FILE, load_class_names
+    from .LabelIndex import refresh_index, class_counts
+except ImportError:
+    # 直接运行本文件时
+    from stem_index import iter_files, CACHE_DIR
+    from parallel_copy import copy_file, parallel_transfer, print_transfer_stats
+    from label_convert import CLASSES_FILE, load_class_names
+    from LabelIndex import refresh_index, class_counts
+
+# ------------------ 文件复制/链接 ------------------
+# 输出文件的方式：复制、硬链接、符号链接、写时复制
+LINK_METHODS = ('copy', 'hardlink', 'symlink', 'reflink')
+
+# main 支持的全部输出方式：LINK_METHODS 之外，'manifest' 只生成划分清单（仅目标检测任务）
+OUTPUT_METHODS = LINK_METHODS + ('manifest',)
+
+# 复制文件的默认线程数
+DEFAULT_WORKERS = 8
+
+# 划分方式：随机 / 按类别分层（仅目标检测）/ 按文件名哈希（结果稳定，支持增量添加）
+SPLIT_MODES = ('random', 'stratified', 'hash')
+
+# 增量模式下用于检查样本是否已被分到另一个子集
+OTHER_SUBSET = {'train': 'val', 'val': 'train'}
+
+# Linux 的 FICLONE ioctl，btrfs、xfs 等文件系统支持
+FICLONE = 0x40049409
+
+
+def reflink_file(src, dst):
+    """写时复制克隆文件，新文件与源文件共享数据块，直到其中一方被修改；不支持时抛出 OSError"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("当前系统不支持 reflink")
+    with open(src, 'rb') as f_src, open(dst, 'wb') as f_dst:
+        try:
+            fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+        except OSError:
+            f_dst.close()
+            os.remove(dst)
+            raise
+
+
+def transfer_file(src, dst, method='copy'):
+    """
+    按 method 把 src 输出到 dst，返回实际使用的方式。
+    链接失败（跨磁盘、文件系统不支持、没有创建符号链接的权限等）时退回复制。
+    """
+    try:
+        if method == 'hardlink':
+            os.link(src, dst)
+            return method
+        if method == 'symlink':
+            os.symlink(os.path.abspath(src), dst)
+            return method
+        if method == 'reflink':
+            reflink_file(src, dst)
+            return method
+    except OSError:
+        pass
+    copy_file(src, dst)
+    return 'copy'
+
+
+def print_transfer_summary(used, method):
+    """打印实际使用的输出方式，链接模式下提示退回复制的文件数"""
+    if method != 'copy' and used['copy']:
+        print(f"注意: 有 {used['copy']} 个文件无法使用 {method}（跨磁盘或文件系统不支持），已改为复制。")
+
+
+def transfer_files(pairs, method='copy', workers=DEFAULT_WORKERS):
+    """由线程池把所有 (源文件, 目标文件) 按 method 输出，并打印速度与实际使用的方式"""
+    stats = parallel_transfer(pairs, lambda src, dst: transfer_file(src, dst, method), workers)
+    print_transfer_summary(stats['results'], method)
+    print_transfer_stats(stats)
+    return stats
+
 
 # ------------------ 目标检测任务相关函数 ------------------
 def create_detection_dir_structure(output_path):
@@ -48,68 +144,306 @@ def create_detection_dir_structure(output_path):
             os.makedirs(os.path.join(output_path, subset, subfolder), exist_ok=True)
 
 
-def split_detection_dataset(input_path, output_path, train_ratio):
+def collect_detection_samples(input_path):
     """
-    划分目标检测数据集。
-    输入路径下需包含 images/ 和 labels/ 两个文件夹，且文件一一对应。
-    根据 train_ratio 划分训练集与验证集，并复制对应文件到输出目录中。
+    读取输入路径下的 images/ 与 labels/，返回有对应标注文件的图像文件名列表；路径无效时返回 None。
+    两个文件夹各只读取一次目录。
     """
     images_dir = os.path.join(input_path, 'images')
     labels_dir = os.path.join(input_path, 'labels')
 
     if not os.path.exists(images_dir) or not os.path.isdir(images_dir):
         print(f"错误: {images_dir} 不是有效的文件夹路径。")
-        return
+        return None
 
     if not os.path.exists(labels_dir) or not os.path.isdir(labels_dir):
         print(f"错误: {labels_dir} 不是有效的文件夹路径。")
-        return
+        return None
 
     # 获取所有图像文件，确保对应的标注文件存在
+    label_names = {name for name, _ in iter_files(labels_dir)}
     image_files = []
-    for file in os.listdir(images_dir):
-        image_path = os.path.join(images_dir, file)
-        if os.path.isfile(image_path):
-            basename, _ = os.path.splitext(file)
-            label_file = basename + ".txt"
-            label_path = os.path.join(labels_dir, label_file)
-            if os.path.exists(label_path):
-                image_files.append(file)
-            else:
-                print(f"警告: {file} 找不到对应的标注文件，已跳过。")
+    for file, basename in iter_files(images_dir):
+        if basename + ".txt" in label_names:
+            image_files.append(file)
+        else:
+            print(f"警告: {file} 找不到对应的标注文件，已跳过。")
 
     if not image_files:
         print("没有找到符合条件的图像和标注文件。")
-        return
+        return None
+    return image_files
+
+
+def split_samples(files, train_ratio):
+    """随机打乱后按 train_ratio 划分，返回 (训练集, 验证集)"""
+    files = list(files)
+    random.shuffle(files)
+    split_idx = int(len(files) * train_ratio)
+    return files[:split_idx], files[split_idx:]
+
+
+def hash_fraction(stem, seed=0):
+    """由种子与主文件名得到 [0, 1) 内的确定值，与文件顺序、文件总数、运行次数都无关"""
+    digest = hashlib.blake2b(f"{seed}:{stem}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2.0 ** 64
+
+
+def hash_split(files, train_ratio, seed=0):
+    """
+    按主文件名哈希划分：hash_fraction 小于 train_ratio 的样本进入训练集。
+    每个样本的归属只取决于自身文件名与种子，新增样本不会改变已有样本的归属。
+    """
+    train_files, val_files = [], []
+    for file in sorted(files):
+        stem = os.path.splitext(os.path.basename(file))[0]
+        (train_files if hash_fraction(stem, seed) < train_ratio else val_files).append(file)
+    return train_files, val_files
+
+
+def filter_existing(output_path, pairs):
+    """
+    增量模式：跳过目标文件已存在的 (源文件, 目标文件)。每个目标文件夹只读取一次目录。
+    返回 (需要输出的 pairs, 已存在的文件数, 已存在于另一子集（train/val）中的目标文件列表)。
+    """
+    listing = {}
+
+    def exists(path):
+        folder, name = os.path.split(path)
+        if folder not in listing:
+            listing[folder] = set(os.listdir(folder)) if os.path.isdir(folder) else set()
+        return name in listing[folder]
+
+    new_pairs, skipped, conflicts = [], 0, []
+    for src, dst in pairs:
+        if exists(dst):
+            skipped += 1
+            continue
+        parts = os.path.relpath(dst, output_path).split(os.sep)
+        if parts[0] in OTHER_SUBSET and exists(os.path.join(output_path, OTHER_SUBSET[parts[0]], *parts[1:])):
+            conflicts.append(dst)
+        new_pairs.append((src, dst))
+    return new_pairs, skipped, conflicts
+
+
+def transfer_split(output_path, pairs, method='copy', workers=DEFAULT_WORKERS, incremental=False):
+    """
+    输出划分结果。incremental 为 True 时只输出目标文件不存在的新样本；
+    若有样本已存在于另一子集（通常是修改了种子或训练集比例），为避免训练集与验证集重叠，不输出任何文件并返回 False。
+    """
+    if incremental:
+        pairs, skipped, conflicts = filter_existing(output_path, pairs)
+        if conflicts:
+            print(f"错误: 有 {len(conflicts)} 个文件已存在于另一个子集中（例如 {conflicts[0]}），"
+                  f"可能修改了种子或训练集比例，为避免训练集与验证集重叠，未输出任何文件。")
+            return False
+        print(f"增量模式：已存在 {skipped} 个文件，本次新增 {len(pairs)} 个文件。")
+    transfer_files(pairs, method, workers)
+    return True
+
 
-    # 随机打乱文件顺序
-    random.shuffle(image_files)
+# ------------------ 按类别分层划分 ------------------
+def label_matrix(index, names):
+    """
+    由标注索引得到每个样本的 (类别, 标注数) 稀疏矩阵（CSR），names 为样本的标注文件名列表。
+    返回 (indptr, classes, counts, 类别数)，第 i 个样本的类别为 classes[indptr[i]:indptr[i+1]]。
+    """
+    owners = np.repeat(np.arange(len(index['names'])), index['counts'])
+    valid = index['class_ids'] >= 0
+    num_classes = int(index['class_ids'][valid].max()) + 1 if valid.any() else 0
+    # 索引中的文件行号 -> 样本序号，不在 names 中的文件为 -1
+    position = {name: i for i, name in enumerate(names)}
+    row_of_file = np.array([position.get(name, -1) for name in index['names'].tolist()], dtype=np.int64)
+    rows = row_of_file[owners]
+    keep = valid & (rows >= 0)
+    keys, counts = np.unique(rows[keep] * max(num_classes, 1) + index['class_ids'][keep], return_counts=True)
+    sample_rows, classes = np.divmod(keys, max(num_classes, 1))
+    indptr = np.searchsorted(sample_rows, np.arange(len(names) + 1))
+    return indptr, classes, counts, num_classes
+
+
+def iterative_stratification(indptr, classes, counts, num_classes, ratios):
+    """
+    多标签迭代分层（Sechidis 等，2011）：每轮取剩余标注最少的类别，把含该类别的样本逐个分给
+    对该类别还缺得最多的子集（相同时取总体还缺得最多的子集，再相同时随机），稀有类别优先分配，
+    使每个类别的标注数都接近 ratios 的比例。没有标注的样本最后按各子集还缺的样本数分配。
+    返回每个样本的子集序号数组。
+    """
+    n = len(indptr) - 1
+    ratios = np.asarray(ratios, dtype=np.float64)
+    totals = np.bincount(classes, weights=counts, minlength=num_classes)
+    desired = np.outer(ratios, totals)
+    desired_total = ratios * n
+    remaining = totals.copy()
+    assignment = np.full(n, -1, dtype=np.int64)
+
+    # 每个类别包含的样本
+    owners = np.repeat(np.arange(n), np.diff(indptr))
+    order = np.argsort(classes, kind='stable')
+    class_ptr = np.searchsorted(classes[order], np.arange(num_classes + 1))
+    members_of = owners[order]
+
+    def choose(candidates):
+        if len(candidates) > 1:
+            by_total = desired_total[candidates]
+            candidates = candidates[by_total == by_total.max()]
+        return int(candidates[0]) if len(candidates) == 1 else random.choice(candidates.tolist())
+
+    while True:
+        live = np.flatnonzero(remaining > 0)
+        if not len(live):
+            break
+        rarest = live[remaining[live] == remaining[live].min()].tolist()
+        c = random.choice(rarest)
+        members = [i for i in members_of[class_ptr[c]:class_ptr[c + 1]].tolist() if assignment[i] < 0]
+        random.shuffle(members)
+        for i in members:
+            need = desired[:, c]
+            subset = choose(np.flatnonzero(need == need.max()))
+            assignment[i] = subset
+            row_classes, row_counts = classes[indptr[i]:indptr[i + 1]], counts[indptr[i]:indptr[i + 1]]
+            desired[subset, row_classes] -= row_counts
+            remaining[row_classes] -= row_counts
+            desired_total[subset] -= 1
+
+    unassigned = np.flatnonzero(assignment < 0).tolist()
+    random.shuffle(unassigned)
+    for i in unassigned:
+        subset = choose(np.flatnonzero(desired_total == desired_total.max()))
+        assignment[i] = subset
+        desired_total[subset] -= 1
+    return assignment
+
+
+def print_class_balance(indptr, classes, counts, num_classes, assignment, names=None, limit=50):
+    """打印每个类别在训练集与验证集中的标注数及训练集占比"""
+    entry_subset = np.repeat(assignment, np.diff(indptr))
+    train = np.bincount(classes[entry_subset == 0], weights=counts[entry_subset == 0], minlength=num_classes)
+    val = np.bincount(classes[entry_subset == 1], weights=counts[entry_subset == 1], minlength=num_classes)
+    for c in range(min(num_classes, limit)):
+        total = train[c] + val[c]
+        if not total:
+            continue
+        name = names[c] if names is not None and c < len(names) else str(c)
+        print(f"  类别 {name}：训练集 {int(train[c])} 个标注，验证集 {int(val[c])} 个标注，训练集占比 {train[c] / total:.3f}")
+    if num_classes > limit:
+        print(f"  ……其余 {num_classes - limit} 个类别省略")
+
+
+def stratified_split(labels_dir, image_files, train_ratio, workers=0):
+    """
+    按类别分层划分目标检测样本，返回 (训练集, 验证集)。
+    标注通过 LabelIndex 读取：首次并行解析后缓存在标注文件夹下的 .cache 中，之后只重新解析有变化的文件。
+    """
+    index, parsed, _ = refresh_index(labels_dir, workers)
+    print(f"已读取标注索引（本次解析 {parsed} 个文件）。")
+    names = [os.path.splitext(os.path.basename(file))[0] + ".txt" for file in image_files]
+    indptr, classes, counts, num_classes = label_matrix(index, names)
+    assignment = iterative_stratification(indptr, classes, counts, num_classes, (train_ratio, 1 - train_ratio))
+    print_class_balance(indptr, classes, counts, num_classes, assignment, load_class_names(labels_dir))
+    train_files = [file for file, subset in zip(image_files, assignment.tolist()) if subset == 0]
+    val_files = [file for file, subset in zip(image_files, assignment.tolist()) if subset == 1]
+    return train_files, val_files
+
+
+def split_detection_samples(input_path, image_files, train_ratio, split_mode='random', workers=0, seed=0):
+    """按 split_mode（见 SPLIT_MODES）把目标检测样本划分为 (训练集, 验证集)"""
+    if split_mode == 'stratified':
+        return stratified_split(os.path.join(input_path, 'labels'), image_files, train_ratio, workers)
+    if split_mode == 'hash':
+        return hash_split(image_files, train_ratio, seed)
+    return split_samples(image_files, train_ratio)
+
+
+def split_detection_dataset(input_path, output_path, train_ratio, method='copy', workers=DEFAULT_WORKERS,
+                            split_mode='random', seed=0, incremental=False):
+    """
+    划分目标检测数据集。
+    输入路径下需包含 images/ 和 labels/ 两个文件夹，且文件一一对应。
+    根据 train_ratio 按 split_mode（见 SPLIT_MODES）划分训练集与验证集，
+    并按 method（见 LINK_METHODS）由 workers 个线程把对应文件输出到目录中；incremental 见 transfer_split。
+    """
+    images_dir = os.path.join(input_path, 'images')
+    labels_dir = os.path.join(input_path, 'labels')
+    image_files = collect_detection_samples(input_path)
+    if image_files is None:
+        return
 
     # 划分训练集和验证集
-    split_idx = int(len(image_files) * train_ratio)
-    train_files = image_files[:split_idx]
-    val_files = image_files[split_idx:]
-
-    # 复制文件到目标目录
-    for file in train_files:
-        basename, _ = os.path.splitext(file)
-        src_img = os.path.join(images_dir, file)
-        src_label = os.path.join(labels_dir, basename + ".txt")
-        dst_img = os.path.join(output_path, 'train', 'images', file)
-        dst_label = os.path.join(output_path, 'train', 'labels', basename + ".txt")
-        shutil.copy(src_img, dst_img)
-        shutil.copy(src_label, dst_label)
-
-    for file in val_files:
-        basename, _ = os.path.splitext(file)
-        src_img = os.path.join(images_dir, file)
-        src_label = os.path.join(labels_dir, basename + ".txt")
-        dst_img = os.path.join(output_path, 'val', 'images', file)
-        dst_label = os.path.join(output_path, 'val', 'labels', basename + ".txt")
-        shutil.copy(src_img, dst_img)
-        shutil.copy(src_label, dst_label)
+    train_files, val_files = split_detection_samples(input_path, image_files, train_ratio, split_mode, workers, seed)
 
+    # 复制（或链接）文件到目标目录
+    pairs = []
+    for subset, files in (('train', train_files), ('val', val_files)):
+        for file in files:
+            basename, _ = os.path.splitext(file)
+            label = basename + ".txt"
+            pairs.append((os.path.join(images_dir, file), os.path.join(output_path, subset, 'images', file)))
+            pairs.append((os.path.join(labels_dir, label), os.path.join(output_path, subset, 'labels', label)))
+    if not transfer_split(output_path, pairs, method, workers, incremental):
+        return
     print(f"目标检测数据集划分完成：训练集 {len(train_files)} 个样本，验证集 {len(val_files)} 个样本。")
+    return True
+
+# ------------------ 清单模式（只生成 train.txt / val.txt / data.yaml） ------------------
+MANIFEST_FILES = ('train.txt', 'val.txt', 'data.yaml')
+
+
+def yaml_str(value):
+    """json 的双引号字符串同时也是合法的 yaml 字符串，路径中的反斜杠、类别名中的冒号等都无需额外处理"""
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def detection_class_names(labels_dir, workers=0):
+    """
+    读取类别名：优先使用标注文件夹中的 classes.txt；没有时通过标注索引（LabelIndex）统计出现过的最大类别编号，
+    类别名用编号代替。workers 为更新索引时的进程数。
+    """
+    names = load_class_names(labels_dir)
+    if names is not None:
+        return names
+    index, _, _ = refresh_index(labels_dir, workers)
+    nc = len(class_counts(index))
+    print(f"注意: {labels_dir} 中没有 {CLASSES_FILE}，按标注中的类别编号生成 {nc} 个类别名，可在 data.yaml 中修改。")
+    return [str(i) for i in range(nc)]
+
+
+def write_data_yaml(path, dataset_dir, train_list, val_list, names):
+    """写出 YOLO 训练用的 data.yaml"""
+    lines = [
+        f"path: {yaml_str(os.path.abspath(dataset_dir))}",
+        f"train: {yaml_str(os.path.abspath(train_list))}",
+        f"val: {yaml_str(os.path.abspath(val_list))}",
+        f"nc: {len(names)}",
+        "names:" if names else "names: {}",
+    ]
+    lines.extend(f"  {i}: {yaml_str(name)}" for i, name in enumerate(names))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def split_detection_manifest(input_path, output_path, train_ratio, split_mode='random', workers=0, seed=0):
+    """
+    只生成划分清单，不复制任何文件：
+    train.txt / val.txt 每行一个图像的绝对路径（训练时按 images -> labels 的对应关系找到标注），
+    data.yaml 指向这两个清单并写入类别名。同一个数据集可以在不同输出目录下保留多份划分。
+    """
+    image_files = collect_detection_samples(input_path)
+    if image_files is None:
+        return
+    images_dir = os.path.abspath(os.path.join(input_path, 'images'))
+    train_files, val_files = split_detection_samples(input_path, image_files, train_ratio, split_mode, workers, seed)
+
+    os.makedirs(output_path, exist_ok=True)
+    train_list, val_list, yaml_path = (os.path.join(output_path, name) for name in MANIFEST_FILES)
+    for list_path, files in ((train_list, train_files), (val_list, val_files)):
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.writelines(os.path.join(images_dir, file) + "\n" for file in files)
+
+    names = detection_class_names(os.path.join(input_path, 'labels'), workers)
+    write_data_yaml(yaml_path, input_path, train_list, val_list, names)
+    print(f"划分清单已生成：训练集 {len(train_files)} 个样本，验证集 {len(val_files)} 个样本，{len(names)} 个类别。")
+    print(f"训练时使用 {yaml_path}")
 
 # ------------------ 目标分类任务相关函数 ------------------
 def create_classification_dir_structure(output_path, class_names):
@@ -119,14 +453,19 @@ def create_classification_dir_structure(output_path, class_names):
             os.makedirs(os.path.join(output_path, subset, class_name), exist_ok=True)
 
 
-def split_classification_dataset(original_path, output_path, train_ratio):
+def split_classification_dataset(original_path, output_path, train_ratio, method='copy', workers=DEFAULT_WORKERS,
+                                 split_mode='random', seed=0, incremental=False):
     """
     划分目标分类数据集。
     原始数据集目录下每个子文件夹代表一个类别，
-    按照 train_ratio 划分为训练集和验证集，并复制文件到目标目录中。
+    按照 train_ratio 划分为训练集和验证集，并按 method（见 LINK_METHODS）由 workers 个线程把文件输出到目标目录中。
+    split_mode 为 'hash' 时按文件名哈希划分，否则随机划分；incremental 见 transfer_split。
     """
-    class_names = os.listdir(original_path)
+    # 每个子文件夹代表一个类别，缓存文件夹 .cache 除外
+    class_names = [name for name in os.listdir(original_path)
+                   if name != CACHE_DIR and os.path.isdir(os.path.join(original_path, name))]
     create_classification_dir_structure(output_path, class_names)
+    pairs = []
 
     for class_name in class_names:
         class_path = os.path.join(original_path, class_name)
@@ -134,42 +473,59 @@ def split_classification_dataset(original_path, output_path, train_ratio):
             continue  # 跳过非目录文件
 
         images = os.listdir(class_path)
-        random.shuffle(images)  # 随机打乱图片顺序
 
         # 划分训练集和验证集
-        split_idx = int(len(images) * train_ratio)
-        train_images = images[:split_idx]
-        val_images = images[split_idx:]
+        if split_mode == 'hash':
+            train_images, val_images = hash_split(images, train_ratio, seed)
+        else:
+            train_images, val_images = split_samples(images, train_ratio)
 
-        # 复制到目标文件夹
+        # 复制（或链接）到目标文件夹
         for img in train_images:
-            shutil.copy(os.path.join(class_path, img),
-                        os.path.join(output_path, 'train', class_name, img))
+            pairs.append((os.path.join(class_path, img), os.path.join(output_path, 'train', class_name, img)))
         for img in val_images:
-            shutil.copy(os.path.join(class_path, img),
-                        os.path.join(output_path, 'val', class_name, img))
+            pairs.append((os.path.join(class_path, img), os.path.join(output_path, 'val', class_name, img)))
+    if not transfer_split(output_path, pairs, method, workers, incremental):
+        return
     print("目标分类数据集划分完成。")
+    return True
 
 # ------------------ 主函数 ------------------
-def main(input_path, output_path, train_ratio, task):
+def main(input_path, output_path, train_ratio, task, method='copy', workers=DEFAULT_WORKERS, split_mode='random',
+         seed=0, incremental=False):
     """
     根据任务模式调用相应的数据集划分函数
     '0'代表目标检测，'1'代表目标分类
+    method 为输出文件的方式，见 OUTPUT_METHODS；workers 为复制文件的线程数（分层划分时也用作解析标注的进程数），0 表示单线程
+    split_mode 为划分方式，见 SPLIT_MODES；目标分类任务本身就按类别文件夹分别划分
+    seed 为哈希划分的种子；incremental 为 True 时向已有的划分结果中只添加新样本（需使用哈希划分）
     """
+    if incremental:
+        if split_mode != 'hash':
+            print("错误: 只添加新文件需要使用按文件名哈希划分，其他划分方式每次的结果不同，会使训练集与验证集重叠。")
+            return
     # 检查输出目录是否存在且非空，若非空则终止操作以防数据丢失
-    if os.path.exists(output_path) and os.listdir(output_path):
+    elif os.path.exists(output_path) and os.listdir(output_path):
         print(f"错误: 输出目录 {output_path} 非空，请选择一个空目录作为输出目录，避免数据丢失。")
         return
 
-    if task == '0':
+    if method == 'manifest':
+        if task != '0':
+            print("错误: 只生成划分清单的方式仅支持目标检测任务，目标分类任务需按类别文件夹输出。")
+            return
+        split_detection_manifest(input_path, output_path, train_ratio, split_mode, workers, seed)
+    elif task == '0':
         # 目标检测任务：输入目录需包含 images/ 和 labels/ 文件夹
         create_detection_dir_structure(output_path)
-        split_detection_dataset(input_path, output_path, train_ratio)
-        print(f"目标检测数据集已生成，结果保存在 {output_path}")
+        if split_detection_dataset(input_path, output_path, train_ratio, method, workers, split_mode, seed, incremental):
+            print(f"目标检测数据集已生成，结果保存在 {output_path}")
     elif task == '1':
         # 目标分类任务：输入目录下每个子文件夹代表一个类别
-        split_classification_dataset(input_path, output_path, train_ratio)
-        print(f"目标分类数据集已生成，结果保存在 {output_path}")
+        if split_mode == 'stratified':
+            print("注意: 目标分类任务本身就按类别文件夹分别划分，各类别比例已与设定一致。")
+        if split_classification_dataset(input_path, output_path, train_ratio, method, workers, split_mode, seed,
+                                        incremental):
+            print(f"目标分类数据集已生成，结果保存在 {output_path}")
     else:
         print("无效的任务选择，请输入 0 或 1。")
 
@@ -0,0 +1,257 @@
+"""
+v1.3
+查找文件夹中的近似重复图片（缩放、重新压缩、轻微平移后的副本），合并数据集后可用于去重，以及检查训练集与验证集之间的泄漏
+每张图片计算感知哈希（差值哈希 dHash，与 Video2Photo 的近重复帧过滤相同），由进程池并行计算，
+JPEG 只按 1/8 尺寸解码，哈希按 (路径, 大小, 修改时间) 缓存在文件夹下（.cache/phash.json）；
+近似重复的查找使用 BK 树，只与汉明距离可能在阈值内的哈希比较，不做 O(n²) 两两比较。
+结果按重复组列出，每组保留文件最大的一张，确认后可删除其余图片。
+重复组是按相似关系传递合并的（A≈B、B≈C 时 A、B、C 为一组，A 与 C 可能相差很大），
+因此只删除与保留图片本身的距离在阈值内的图片，其余图片虽在同一组中也予以保留，并列出各自与保留图片的距离。
+
+v1.3: 不包含子文件夹时不再扫描子文件夹；单个文件读取出错（权限不足、扫描后被删除等）时跳过并报告，不再中断整个查找
+"""
+import os
+import json
+import cv2
+import numpy as np
+
+try:
+    from .Video2Photo import frame_signature
+    from .CompareFolders import scan_files
+    from .batch_jobs import map_chunks
+    from .atomic_file import atomic_save_json
+    from .stem_index import cache_path
+except ImportError:
+    # 直接运行本文件时
+    from Video2Photo import frame_signature
+    from CompareFolders import scan_files
+    from batch_jobs import map_chunks
+    from atomic_file import atomic_save_json
+    from stem_index import cache_path
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff')
+
+# 哈希边长，哈希共 HASH_SIZE * HASH_SIZE 位
+HASH_SIZE = 8
+
+
+def image_hash(image_path, hash_size=HASH_SIZE):
+    """计算图片的 dHash，返回十六进制字符串，图片无法读取时返回 None（支持中文路径）"""
+    data = np.fromfile(image_path, dtype=np.uint8)
+    # 只需要很小的缩略图，按 1/8 尺寸解码灰度图即可，JPEG 解码快得多
+    img = cv2.imdecode(data, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None or min(img.shape[:2]) < hash_size + 1:
+        img = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    bits = np.packbits(frame_signature(img, hash_size))
+    return bits.tobytes().hex()
+
+
+def _hash_chunk(rel_paths, folder, hash_size):
+    """子进程入口：计算一块图片的哈希，返回 [(相对路径, 哈希或None)]，单个文件读取出错时哈希为 None，不影响其余文件"""
+    results = []
+    for rel in rel_paths:
+        try:
+            digest = image_hash(os.path.join(folder, rel), hash_size)
+        except OSError:
+            digest = None
+        results.append((rel, digest))
+    return results
+
+
+def phash_cache_path(folder):
+    """哈希缓存保存在文件夹下：<文件夹>/.cache/phash.json"""
+    return cache_path(folder, 'phash.json')
+
+
+def load_phash_cache(folder, hash_size):
+    """读取哈希缓存 {相对路径: [大小, 修改时间ns, 哈希]}，不存在、损坏或哈希边长不同时返回空字典"""
+    try:
+        with open(phash_cache_path(folder), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('hash_size') != hash_size:
+            return {}
+        return data.get('files', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_phash_cache(folder, hash_size, files):
+    atomic_save_json(phash_cache_path(folder), {'hash_size': hash_size, 'files': files})
+
+
+def compute_hashes(folder, recursive=True, workers=4, chunk_size=64, hash_size=HASH_SIZE):
+    """
+    计算文件夹中所有图片的哈希，返回 ({相对路径: 哈希整数}, {相对路径: 文件大小}, 实际计算数, 无法读取的文件列表)。
+    大小与修改时间都与缓存一致的图片直接使用缓存。
+    """
+    files = scan_files(folder, recursive, IMAGE_EXTENSIONS)
+    cache = load_phash_cache(folder, hash_size)
+    hashes, todo = {}, []
+    for rel, (size, mtime) in files.items():
+        cached = cache.get(rel)
+        if cached is not None and cached[0] == size and cached[1] == mtime:
+            hashes[rel] = cached[2]
+        else:
+            todo.append(rel)
+
+    results = []
+    if workers <= 0:
+        results = _hash_chunk(todo, folder, hash_size)
+    elif todo:
+        for chunk_results in map_chunks(_hash_chunk, todo, workers, chunk_size, (folder, hash_size),
+                                        label="计算哈希进度", progress_every=20):
+            results.extend(chunk_results)
+
+    unreadable = []
+    for rel, digest in results:
+        if digest is None:
+            unreadable.append(rel)
+            continue
+        hashes[rel] = digest
+        cache[rel] = [files[rel][0], files[rel][1], digest]
+    # 缓存中只保留仍然存在的图片；不包含子文件夹时保留子文件夹中图片的缓存，供之后包含子文件夹时使用
+    save_phash_cache(folder, hash_size, {rel: entry for rel, entry in cache.items()
+                                         if rel in files or (not recursive and os.sep in rel)})
+    return ({rel: int(digest, 16) for rel, digest in hashes.items()},
+            {rel: files[rel][0] for rel in hashes}, len(todo), sorted(unreadable))
+
+
+# ------------------ BK 树 ------------------
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def bk_insert(tree, value, item):
+    """
+    向 BK 树插入哈希值，节点结构为 [哈希值, [条目...], {距离: 子节点}]，相同哈希值的条目放在同一节点。
+    tree 为空列表时作为根节点。
+    """
+    if not tree:
+        tree.extend([value, [item], {}])
+        return
+    node = tree
+    while True:
+        d = hamming(value, node[0])
+        if d == 0:
+            node[1].append(item)
+            return
+        child = node[2].get(d)
+        if child is None:
+            node[2][d] = [value, [item], {}]
+            return
+        node = child
+
+
+def bk_search(tree, value, threshold):
+    """返回与 value 的汉明距离不超过 threshold 的所有条目；利用三角不等式只进入距离在 [d-t, d+t] 内的子树"""
+    if not tree:
+        return []
+    found, stack = [], [tree]
+    while stack:
+        node = stack.pop()
+        d = hamming(value, node[0])
+        if d <= threshold:
+            found.extend(node[1])
+        for dist, child in node[2].items():
+            if d - threshold <= dist <= d + threshold:
+                stack.append(child)
+    return found
+
+
+def find_clusters(hashes, threshold):
+    """把汉明距离不超过 threshold 的图片（可传递地）合并为重复组，返回 [[相对路径, ...], ...]"""
+    tree = []
+    for rel, value in hashes.items():
+        bk_insert(tree, value, rel)
+
+    parent = {rel: rel for rel in hashes}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for rel, value in hashes.items():
+        for other in bk_search(tree, value, threshold):
+            ra, rb = find(rel), find(other)
+            if ra != rb:
+                parent[rb] = ra
+
+    groups = {}
+    for rel in hashes:
+        groups.setdefault(find(rel), []).append(rel)
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda g: g[0])
+
+
+def plan_group(group, hashes, sizes, threshold):
+    """
+    为一个重复组选出保留的图片（文件最大的一张，通常分辨率或画质最高），
+    返回 (保留的图片, [(相对路径, 与保留图片的汉明距离, 是否删除), ...])。
+    只有与保留图片的距离不超过 threshold 的图片才删除，只经组内其他图片间接相似的图片保留。
+    """
+    keep = max(group, key=lambda rel: (sizes[rel], rel))
+    plan = []
+    for rel in group:
+        if rel != keep:
+            distance = hamming(hashes[rel], hashes[keep])
+            plan.append((rel, distance, distance <= threshold))
+    return keep, plan
+
+
+def find_duplicates(folder, threshold=4, recursive=True, workers=4):
+    """返回 (重复组列表, {相对路径: 哈希}, {相对路径: 文件大小}, 实际计算哈希数, 无法读取的文件列表)"""
+    hashes, sizes, hashed, unreadable = compute_hashes(folder, recursive, workers)
+    return find_clusters(hashes, threshold), hashes, sizes, hashed, unreadable
+
+
+def main(folder, threshold=4, recursive=True, workers=4, limit=50):
+    if not os.path.exists(folder) or not os.path.isdir(folder):
+        print(f"错误: {folder} 不是有效的文件夹路径。")
+        return
+    clusters, hashes, sizes, hashed, unreadable = find_duplicates(folder, threshold, recursive, workers)
+    print(f"共 {len(hashes)} 张图片，本次计算哈希 {hashed} 张（其余使用缓存），找到 {len(clusters)} 组近似重复图片。")
+    for rel in unreadable:
+        print(f"警告: 无法读取 {rel}，已跳过。")
+    if not clusters:
+        return
+
+    # 每组保留文件最大的一张，与它的距离在阈值内的图片标记为删除
+    to_delete = []
+    chained = 0
+    for n, group in enumerate(clusters, start=1):
+        keep, plan = plan_group(group, hashes, sizes, threshold)
+        if n <= limit:
+            print(f"第 {n} 组（{len(group)} 张）：")
+            print(f"  [保留] {keep}")
+        for rel, distance, delete in plan:
+            if delete:
+                to_delete.append(os.path.join(folder, rel))
+            else:
+                chained += 1
+            if n <= limit:
+                status = '[删除]' if delete else '[保留，仅经组内其他图片间接相似]'
+                print(f"  {status} {rel}（与保留图片距离 {distance}）")
+    if len(clusters) > limit:
+        print(f"……其余 {len(clusters) - limit} 组省略")
+
+    print(f"共 {len(to_delete)} 张图片标记为删除。")
+    if chained:
+        print(f"另有 {chained} 张图片与保留图片的距离超过阈值 {threshold}（只与组内其他图片相似），不会删除，请人工核对。")
+    confirm = input("是否删除以上标记为 [删除] 的图片？(y/n): ")
+    if confirm.lower() == 'y':
+        for file_path in to_delete:
+            os.remove(file_path)
+        print("已删除所有标记的图片")
+    else:
+        print("未删除任何文件。")
+
+
+if __name__ == "__main__":
+    # 图片文件夹路径（包含子文件夹，例如数据集根目录，可同时检查 train 与 val 之间的重复）
+    folder = r"C:\Users\dataset\images"
+    # 汉明距离阈值，越大找到的重复越多（64 位哈希，建议 0-10）
+    threshold = 4
+    main(folder, threshold)
@@ -1,12 +1,19 @@
 """
-v1.0
+v1.1
 用于比较两个目录中文件名是否存在对应的标注文件，
 如果第二个目录不包含与第一个目录中同名（不包括后缀）的标注文件，则在第二个目录生成一个空白txt文件。
 例如：文件夹一中包含 001.jpg、002.jpg，文件夹二中包含 001.txt、classes.txt，
 则会在文件夹二中生成一个空白的 002.txt 文件。
+v1.1: 两个文件夹各只读取一次目录，不再对每个文件单独判断标注文件是否存在
 """
 import os
 
+try:
+    from .stem_index import iter_files
+except ImportError:
+    # 直接运行本文件时
+    from stem_index import iter_files
+
 
 def create_blank_annotation_files(folder1, folder2):
     """
@@ -21,19 +28,18 @@ def create_blank_annotation_files(folder1, folder2):
         print(f"错误: {folder2} 不是有效的文件夹路径。")
         return
 
-    for file in os.listdir(folder1):
-        file_path = os.path.join(folder1, file)
-        if os.path.isfile(file_path):
-            basename, _ = os.path.splitext(file)
-            annotation_path = os.path.join(folder2, basename + ".txt")
-            if os.path.exists(annotation_path):
-                # 如果 folder2 中已存在对应的标注文件则跳过
-                continue
-            else:
-                # 在 folder2 中生成空白的txt文件
-                with open(annotation_path, 'w', encoding='utf-8') as f:
-                    pass
-                print(f"已创建: {annotation_path}")
+    # folder2 中已有的文件名
+    existing = {name for name, _ in iter_files(folder2)}
+    for file, basename in list(iter_files(folder1)):
+        if basename + ".txt" in existing:
+            # 如果 folder2 中已存在对应的标注文件则跳过
+            continue
+        # 在 folder2 中生成空白的txt文件
+        annotation_path = os.path.join(folder2, basename + ".txt")
+        with open(annotation_path, 'w', encoding='utf-8') as f:
+            pass
+        existing.add(basename + ".txt")
+        print(f"已创建: {annotation_path}")
 
 
 def main(folder1, folder2):
@@ -0,0 +1,252 @@
+"""
+v1.1
+YOLO 标注文件夹的持久化索引
+把整个标注文件夹解析为一份列式存储（.npz，保存在标注文件夹下的 .cache/index.npz）：
+每个文件的主文件名、修改时间、大小、标注行数，以及所有标注拼接而成的类别编号数组与 (N, 4) 检测框数组。
+再次运行时只重新解析修改时间或大小发生变化的文件，其余文件直接沿用索引中的数据，
+各类别的标注数、包含某个类别的文件等查询直接在数组上完成，无需重新打开成千上万个小文件。
+v1.1: 索引从标注文件夹旁（<标注文件夹>.index.npz）移到标注文件夹内的 .cache/index.npz，不再写入上级目录
+"""
+import os
+import time
+import numpy as np
+
+try:
+    from .label_convert import CLASSES_FILE, load_class_names
+    from .batch_jobs import map_chunks
+    from .atomic_file import atomic_open
+    from .stem_index import cache_path
+except ImportError:
+    # 直接运行本文件时
+    from label_convert import CLASSES_FILE, load_class_names
+    from batch_jobs import map_chunks
+    from atomic_file import atomic_open
+    from stem_index import cache_path
+
+INDEX_VERSION = 1
+
+# 索引中保存的数组
+INDEX_KEYS = ('names', 'mtime_ns', 'size', 'counts', 'invalid', 'class_ids', 'boxes')
+
+
+def index_path(folder):
+    """索引文件保存在标注文件夹下：<标注文件夹>/.cache/index.npz"""
+    return cache_path(folder, 'index.npz')
+
+
+def scan_label_files(folder):
+    """一次 scandir 得到 {文件名: (修改时间ns, 大小)}，classes.txt 除外"""
+    files = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.name.endswith('.txt') and entry.name != CLASSES_FILE and entry.is_file():
+                st = entry.stat()
+                files[entry.name] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def parse_label_file(file_path):
+    """
+    解析一个 YOLO 标注文件，返回 (类别编号数组, (N, 4) 检测框数组, 格式错误的行数)。
+    检测框为归一化的 [中心x, 中心y, 宽, 高]，分割格式的行取多边形的外接框。
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    rows = [line.split() for line in text.splitlines() if line.strip()]
+    if rows and all(len(row) == 5 for row in rows):
+        try:
+            values = np.array(rows, dtype=np.float64)
+            return values[:, 0].astype(np.int32), values[:, 1:], 0
+        except ValueError:
+            pass
+
+    class_ids, boxes, invalid = [], [], 0
+    for row in rows:
+        try:
+            class_id = int(row[0])
+            coords = np.array(row[1:], dtype=np.float64)
+        except ValueError:
+            invalid += 1
+            continue
+        if len(coords) == 4:
+            boxes.append(coords)
+        elif len(coords) >= 6 and len(coords) % 2 == 0:
+            pts = coords.reshape(-1, 2)
+            mins, maxs = pts.min(axis=0), pts.max(axis=0)
+            boxes.append(np.concatenate([(mins + maxs) / 2.0, maxs - mins]))
+        else:
+            invalid += 1
+            continue
+        class_ids.append(class_id)
+    return np.array(class_ids, dtype=np.int32), np.array(boxes, dtype=np.float64).reshape(-1, 4), invalid
+
+
+def _parse_chunk(paths):
+    """子进程入口：解析一块文件，返回与 paths 对应的解析结果列表"""
+    return [parse_label_file(path) for path in paths]
+
+
+def parse_files(paths, workers=0, chunk_size=256):
+    """解析多个标注文件，workers 大于 0 时按 chunk_size 分块多进程解析，结果顺序与 paths 一致"""
+    if workers <= 0 or len(paths) <= chunk_size:
+        return _parse_chunk(paths)
+    results = map_chunks(_parse_chunk, paths, workers, chunk_size, label=None)
+    return [item for chunk in results for item in chunk]
+
+
+def empty_index():
+    return {
+        'names': np.zeros(0, dtype=str),
+        'mtime_ns': np.zeros(0, dtype=np.int64),
+        'size': np.zeros(0, dtype=np.int64),
+        'counts': np.zeros(0, dtype=np.int64),
+        'invalid': np.zeros(0, dtype=np.int64),
+        'class_ids': np.zeros(0, dtype=np.int32),
+        'boxes': np.zeros((0, 4), dtype=np.float32),
+    }
+
+
+def load_index(path):
+    """读取索引文件，不存在或版本不符时返回空索引"""
+    if not os.path.isfile(path):
+        return empty_index()
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != INDEX_VERSION:
+                return empty_index()
+            return {key: data[key] for key in INDEX_KEYS}
+    except (OSError, ValueError, KeyError):
+        return empty_index()
+
+
+def save_index(path, index):
+    with atomic_open(path, 'wb') as f:
+        np.savez(f, version=np.int64(INDEX_VERSION), **index)
+
+
+def _take_files(index, file_mask):
+    """按文件掩码取出部分文件及其全部标注"""
+    box_mask = np.repeat(file_mask, index['counts'])
+    taken = {key: index[key][file_mask] for key in ('names', 'mtime_ns', 'size', 'counts', 'invalid')}
+    taken['class_ids'] = index['class_ids'][box_mask]
+    taken['boxes'] = index['boxes'][box_mask]
+    return taken
+
+
+def _sort_files(index):
+    """按文件名排序，每个文件的标注段随文件一起移动"""
+    order = np.argsort(index['names'], kind='stable')
+    counts = index['counts']
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    new_counts = counts[order]
+    new_starts = np.concatenate(([0], np.cumsum(new_counts)[:-1])).astype(np.int64)
+    # 每个标注在原数组中的位置 = 原文件起点 + (新位置 - 新文件起点)
+    box_order = np.repeat(starts[order] - new_starts, new_counts) + np.arange(int(new_counts.sum()))
+    sorted_index = {key: index[key][order] for key in ('names', 'mtime_ns', 'size', 'counts', 'invalid')}
+    sorted_index['class_ids'] = index['class_ids'][box_order]
+    sorted_index['boxes'] = index['boxes'][box_order]
+    return sorted_index
+
+
+def refresh_index(folder, workers=0, save=True):
+    """
+    扫描标注文件夹并刷新索引，返回 (索引, 重新解析的文件数, 删除的文件数)。
+    修改时间与大小都没有变化的文件沿用旧索引中的数据，其余文件重新解析。
+    """
+    path = index_path(folder)
+    old = load_index(path)
+    files = scan_label_files(folder)
+
+    old_names = old['names'].tolist()
+    unchanged = np.array([files.get(name) == (mtime, size) for name, mtime, size
+                          in zip(old_names, old['mtime_ns'].tolist(), old['size'].tolist())], dtype=bool)
+    kept = _take_files(old, unchanged)
+    kept_names = set(kept['names'].tolist())
+    removed = sum(1 for name in old_names if name not in files)
+
+    changed_names = sorted(name for name in files if name not in kept_names)
+    parsed = parse_files([os.path.join(folder, name) for name in changed_names], workers)
+
+    if changed_names:
+        new = {
+            'names': np.array(changed_names),
+            'mtime_ns': np.array([files[name][0] for name in changed_names], dtype=np.int64),
+            'size': np.array([files[name][1] for name in changed_names], dtype=np.int64),
+            'counts': np.array([len(class_ids) for class_ids, _, _ in parsed], dtype=np.int64),
+            'invalid': np.array([invalid for _, _, invalid in parsed], dtype=np.int64),
+            'class_ids': np.concatenate([class_ids for class_ids, _, _ in parsed]).astype(np.int32),
+            'boxes': np.concatenate([boxes for _, boxes, _ in parsed]).astype(np.float32),
+        }
+        index = _sort_files({key: np.concatenate([kept[key], new[key]]) for key in INDEX_KEYS})
+    else:
+        index = kept
+
+    if save and (changed_names or removed or not os.path.isfile(path)):
+        save_index(path, index)
+    return index, len(changed_names), removed
+
+
+# ---------------------------- 查询 ----------------------------
+
+def file_indices(index):
+    """每个标注所属文件在 names 中的序号"""
+    return np.repeat(np.arange(len(index['names'])), index['counts'])
+
+
+def class_counts(index):
+    """各类别的标注数，下标为类别编号"""
+    return np.bincount(index['class_ids'][index['class_ids'] >= 0])
+
+
+def class_file_counts(index):
+    """各类别出现在多少个文件中，下标为类别编号"""
+    pairs = np.unique(np.stack([file_indices(index), index['class_ids']], axis=1), axis=0)
+    return np.bincount(pairs[:, 1][pairs[:, 1] >= 0]) if len(pairs) else np.zeros(0, dtype=np.int64)
+
+
+def files_with_class(index, class_id):
+    """包含指定类别的文件名列表"""
+    return index['names'][np.unique(file_indices(index)[index['class_ids'] == class_id])].tolist()
+
+
+def empty_files(index):
+    """没有任何标注的文件名列表"""
+    return index['names'][index['counts'] == 0].tolist()
+
+
+def main(folder, class_id=None, workers=0, limit=50):
+    if not os.path.isdir(folder):
+        print(f"错误: {folder} 不是有效的文件夹路径。")
+        return
+    start_time = time.time()
+    index, parsed, removed = refresh_index(folder, workers)
+    print(f"索引已更新：共 {len(index['names'])} 个标注文件，{len(index['class_ids'])} 个标注，"
+          f"重新解析 {parsed} 个，移除 {removed} 个，用时 {time.time() - start_time:.2f} 秒")
+    print(f"索引文件：{index_path(folder)}")
+
+    names = load_class_names(folder)
+    counts, file_counts = class_counts(index), class_file_counts(index)
+    print("各类别统计：")
+    for k in range(len(counts)):
+        if counts[k]:
+            name = f"({names[k]})" if names and k < len(names) else ""
+            print(f"  类别 {k}{name}：{counts[k]} 个标注，出现在 {file_counts[k]} 个文件中")
+    print(f"空白标注文件：{len(empty_files(index))} 个")
+    if index['invalid'].sum():
+        print(f"格式错误的行：{int(index['invalid'].sum())} 行，涉及 {int((index['invalid'] > 0).sum())} 个文件")
+
+    if class_id is not None:
+        found = files_with_class(index, class_id)
+        print(f"包含类别 {class_id} 的文件共 {len(found)} 个：")
+        for name in found[:limit]:
+            print(f"  {name}")
+        if len(found) > limit:
+            print(f"  ……其余 {len(found) - limit} 个省略")
+
+
+if __name__ == "__main__":
+    # 标注文件夹路径
+    folder = "C:/Users/Desktop/dataset/labels"
+    # 需要列出文件的类别编号，None 表示只输出统计
+    class_id = None
+    main(folder, class_id)
@@ -0,0 +1,227 @@
+"""
+v1.2
+YOLO 标注文件检查
+每个文件读入一个 NumPy 数组后统一检查：格式错误的行、坐标超出 [0, 1]、宽或高为 0 的框、
+完全重复的行，以及同类别两两 IoU 超过阈值的近似重复框（重复标注）。
+支持多进程并行，结果写入标注文件夹下的 json 报告（.cache/validation.json），并输出汇总。
+v1.1: 报告从标注文件夹旁（<标注文件夹>.validation.json）移到标注文件夹内的 .cache/validation.json
+v1.2: 近似重复框按类别分组、按左边界排序后分块计算 IoU，只比较水平方向可能相交的框，不再构造全部框两两之间的 N×N 矩阵，框很多的文件内存与耗时都有上限
+"""
+import os
+import json
+from collections import Counter
+import numpy as np
+
+try:
+    from .label_convert import CLASSES_FILE
+    from .batch_jobs import map_chunks
+    from .atomic_file import atomic_open
+    from .stem_index import cache_path
+except ImportError:
+    # 直接运行本文件时
+    from label_convert import CLASSES_FILE
+    from batch_jobs import map_chunks
+    from atomic_file import atomic_open
+    from stem_index import cache_path
+
+# 问题类型及说明
+ISSUE_KINDS = {
+    'invalid': "格式错误的行",
+    'out_of_bounds': "坐标超出 [0, 1] 的行",
+    'zero_area': "宽或高为 0 的框",
+    'duplicate': "完全重复的行",
+    'near_duplicate': "同类别 IoU 超过阈值的近似重复框",
+}
+
+# 判断越界时允许的浮点误差
+EPS = 1e-6
+
+# 计算 IoU 时每块 (行数 × 列数) 的最大元素数
+IOU_BLOCK_ELEMENTS = 1 << 18
+
+
+def report_path(folder):
+    """检查报告保存在标注文件夹下：<标注文件夹>/.cache/validation.json"""
+    return cache_path(folder, 'validation.json')
+
+
+def pairwise_iou(boxes1, boxes2):
+    """(N, 4) 与 (M, 4) 的 [x1, y1, x2, y2] 框两两之间的 IoU，返回 (N, M) 矩阵"""
+    lt = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    rb = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area1 = np.prod(boxes1[:, 2:] - boxes1[:, :2], axis=1)
+    area2 = np.prod(boxes2[:, 2:] - boxes2[:, :2], axis=1)
+    union = area1[:, None] + area2[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def near_duplicate_pairs(xyxy, class_ids, candidates, iou_threshold):
+    """
+    在 candidates（行序号数组）中找出同类别、IoU 不低于阈值的 (i, j, IoU)，按 (i, j) 排序，i < j。
+    先按类别分组，只在组内计算 IoU；组内按左边界排序后按行分块，每块只与左边界小于块内最大右边界的框比较
+    （水平方向不相交的框 IoU 为 0），每块的中间数组不超过 IOU_BLOCK_ELEMENTS 个元素，
+    一个文件有成千上万个框时内存占用也有上限。
+    """
+    pairs = []
+    order = candidates[np.argsort(class_ids[candidates], kind='stable')]
+    bounds = np.flatnonzero(np.diff(class_ids[order])) + 1
+    for group in np.split(order, bounds):
+        if len(group) < 2:
+            continue
+        group = group[np.argsort(xyxy[group, 0], kind='stable')]
+        boxes = xyxy[group]
+        step = max(1, IOU_BLOCK_ELEMENTS // len(group))
+        for start in range(0, len(group) - 1, step):
+            stop = min(start + step, len(group))
+            end = max(stop, int(np.searchsorted(boxes[:, 0], boxes[start:stop, 2].max(), side='right')))
+            iou = pairwise_iou(boxes[start:stop], boxes[start:end])
+            # 每对只取一次：列在行之后
+            hits = (iou >= iou_threshold) & (np.arange(start, end)[None, :] > np.arange(start, stop)[:, None])
+            for a, b in zip(*np.nonzero(hits)):
+                i, j = int(group[start + a]), int(group[start + b])
+                pairs.append((min(i, j), max(i, j), float(iou[a, b])))
+    pairs.sort()
+    return pairs
+
+
+def validate_file(file_path, iou_threshold=0.9):
+    """检查单个标注文件，返回问题列表 [(类型, 行号, 说明)]，行号从 1 开始"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    issues = []
+    line_nos, class_ids, boxes, oob = [], [], [], []
+    for line_no, line in enumerate(lines, start=1):
+        parts = line.split()
+        if not parts:
+            continue
+        try:
+            class_id = int(parts[0])
+            coords = np.array(parts[1:], dtype=np.float64)
+        except ValueError:
+            issues.append(('invalid', line_no, line.strip()))
+            continue
+        if len(coords) == 4:
+            box = coords
+            out = (coords < -EPS).any() or (coords > 1 + EPS).any()
+        elif len(coords) >= 6 and len(coords) % 2 == 0:
+            # 分割格式：检查全部顶点，框取多边形的外接框
+            pts = coords.reshape(-1, 2)
+            mins, maxs = pts.min(axis=0), pts.max(axis=0)
+            box = np.concatenate([(mins + maxs) / 2.0, maxs - mins])
+            out = (coords < -EPS).any() or (coords > 1 + EPS).any()
+        else:
+            issues.append(('invalid', line_no, line.strip()))
+            continue
+        line_nos.append(line_no)
+        class_ids.append(class_id)
+        boxes.append(box)
+        oob.append(out)
+
+    if not boxes:
+        return issues
+    line_nos = np.array(line_nos)
+    class_ids = np.array(class_ids)
+    cxcywh = np.array(boxes)
+    xyxy = np.hstack([cxcywh[:, :2] - cxcywh[:, 2:] / 2.0, cxcywh[:, :2] + cxcywh[:, 2:] / 2.0])
+
+    # 越界：中心点/宽高本身越界（或分割顶点越界），或框的边超出图片
+    out_of_bounds = np.array(oob) | (xyxy < -EPS).any(axis=1) | (xyxy > 1 + EPS).any(axis=1)
+    for i in np.flatnonzero(out_of_bounds).tolist():
+        issues.append(('out_of_bounds', int(line_nos[i]), " ".join(f"{v:.6f}" for v in cxcywh[i].tolist())))
+
+    zero_area = (cxcywh[:, 2] <= 0) | (cxcywh[:, 3] <= 0)
+    for i in np.flatnonzero(zero_area).tolist():
+        issues.append(('zero_area', int(line_nos[i]), f"w={cxcywh[i, 2]:.6f} h={cxcywh[i, 3]:.6f}"))
+
+    # 完全重复：类别与坐标都相同，保留第一次出现的行
+    rows = np.hstack([class_ids[:, None], cxcywh])
+    _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    duplicate = first[inverse] != np.arange(len(rows))
+    for i in np.flatnonzero(duplicate).tolist():
+        issues.append(('duplicate', int(line_nos[i]), f"与第 {int(line_nos[first[inverse[i]]])} 行相同"))
+
+    # 近似重复：同类别、都不是完全重复行、IoU 超过阈值的两两组合
+    if len(rows) > 1:
+        for i, j, iou in near_duplicate_pairs(xyxy, class_ids, np.flatnonzero(~duplicate), iou_threshold):
+            issues.append(('near_duplicate', int(line_nos[j]), f"与第 {int(line_nos[i])} 行 IoU={iou:.3f}"))
+
+    issues.sort(key=lambda issue: issue[1])
+    return issues
+
+
+def _validate_chunk(paths, iou_threshold):
+    """子进程入口：检查一块文件，返回 {文件名: 问题列表}（只包含有问题的文件）"""
+    results = {}
+    for path in paths:
+        try:
+            issues = validate_file(path, iou_threshold)
+        except Exception as e:
+            issues = [('invalid', 0, f"读取失败：{e}")]
+        if issues:
+            results[os.path.basename(path)] = issues
+    return results
+
+
+def validate_labels(folder, iou_threshold=0.9, workers=0, chunk_size=256):
+    """检查文件夹中所有 txt 标注文件，返回 (文件总数, {文件名: 问题列表})"""
+    paths = sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                   if f.endswith('.txt') and f != CLASSES_FILE and os.path.isfile(os.path.join(folder, f)))
+    if workers <= 0:
+        return len(paths), _validate_chunk(paths, iou_threshold)
+
+    results = {}
+    for chunk_results in map_chunks(_validate_chunk, paths, workers, chunk_size, (iou_threshold,)):
+        results.update(chunk_results)
+    return len(paths), results
+
+
+def write_report(path, folder, total, results, iou_threshold):
+    """写出 json 报告：汇总统计 + 每个文件的问题列表"""
+    summary = Counter(kind for issues in results.values() for kind, _, _ in issues)
+    report = {
+        'folder': os.path.abspath(folder),
+        'iou_threshold': iou_threshold,
+        'total_files': total,
+        'files_with_issues': len(results),
+        'summary': {kind: summary.get(kind, 0) for kind in ISSUE_KINDS},
+        'files': {name: [{'kind': kind, 'line': line, 'detail': detail} for kind, line, detail in issues]
+                  for name, issues in results.items()},
+    }
+    with atomic_open(path) as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    return summary
+
+
+def main(folder, iou_threshold=0.9, workers=0, limit=30):
+    if not os.path.isdir(folder):
+        print(f"错误: {folder} 不是有效的文件夹路径。")
+        return
+    total, results = validate_labels(folder, iou_threshold, workers)
+    path = report_path(folder)
+    summary = write_report(path, folder, total, results, iou_threshold)
+
+    print(f"检查完成：共 {total} 个标注文件，其中 {len(results)} 个存在问题")
+    for kind, desc in ISSUE_KINDS.items():
+        if summary[kind]:
+            files = sum(1 for issues in results.values() if any(k == kind for k, _, _ in issues))
+            print(f"  {desc}：{summary[kind]} 处，涉及 {files} 个文件")
+    shown = 0
+    for name, issues in results.items():
+        for kind, line, detail in issues:
+            if shown < limit:
+                print(f"  [{ISSUE_KINDS[kind]}] {name} 第 {line} 行 {detail}")
+            shown += 1
+    if shown > limit:
+        print(f"  ……其余 {shown - limit} 处省略")
+    print(f"完整报告：{path}")
+
+
+if __name__ == "__main__":
+    # 标注文件夹路径
+    folder = "C:/Users/Desktop/dataset/labels"
+    # 近似重复框的 IoU 阈值
+    iou_threshold = 0.9
+    main(folder, iou_threshold)
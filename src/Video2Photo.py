@@ -1,52 +1,654 @@
 """
-v1.1
-用于视频转图片,opencv速度稍快于iio,若您不愿使用opencv,请使用52行后的v1.1x版本
+v2.1
+用于视频转图片,opencv速度稍快于iio,若您不愿使用opencv,请使用文件末尾的v1.1x版本
 更新文件名为五位数，修复中文路径无法正确保存的bug
+v1.2: 新增抽帧模式，跳过的帧不再完整解码，只有需要保存的帧才会解码
+v1.3: 解码与编码写盘流水线化，一个线程解码，线程池编码写盘，中间用有界队列限制内存占用
+v1.4: 新增批量模式，多个视频分配到进程池并行抽帧，每个视频输出到独立子文件夹，单个视频失败不影响其余视频
+v1.5: 新增近重复帧过滤，计算每个候选帧的差值哈希(dHash)，与上一张保存帧过于相似的帧在编码前直接丢弃
+v1.6: 新增分段并行模式，根据帧数元数据预先把单个长视频切分为若干段，每段在独立进程中定位并解码，
+      各段的起始编号预先算出，输出与顺序运行完全一致
+v1.7: 新增时间范围抽帧（直接定位到各 [开始秒, 结束秒] 区间）与关键帧模式（只解码 I 帧，需要 PyAV）
+v1.8: 新增输出选项：缩放（限制最长边或 letterbox 到固定训练尺寸）、JPEG/WebP 质量、输出格式(jpg/png/webp)，
+      在内存中处理后只编码一次，省去训练前单独的缩放环节
+v1.9: 结果分别统计解码的帧数与保存的图片数，帧率按实际解码的帧数计算，
+      不再用最后一张保存帧的序号代替（抽帧、时间范围、近重复过滤时两者相差很大）
+v2.0: 批量模式中不同文件夹下的同名视频（如 a/clip.avi 与 b/clip.avi）分别输出到以相对路径命名的子文件夹，
+      开始处理前确认每个视频的输出文件夹互不相同，不再互相覆盖
+v2.1: 单个、批量、分段三种入口共用同一个参数校验函数，时间范围不合法时批量模式在开始前报错，不再每个视频各失败一次
 """
 import os
+import math
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import cv2
+import numpy as np
 
-def save_image(image, folder, num):
+# 抽帧模式：
+# 'read' : 逐帧完整解码，即旧版行为
+# 'grab' : 跳过的帧只调用 grab() 推进码流，不做 retrieve() 解码与颜色转换，输出与 'read' 完全一致（默认）
+# 'seek' : 直接定位到目标帧再解码，适合帧间隔很大且容器支持随机访问的视频，部分编码格式下定位可能不精确
+# 'key'  : 只解码关键帧(I帧)，其余帧连解码都跳过，适合快速粗略采样，此模式忽略帧间隔，需要安装 PyAV(pip install av)
+EXTRACT_MODES = ('read', 'grab', 'seek', 'key')
+
+# 分段并行支持的抽帧模式（关键帧模式无法按帧序号分段）
+SEGMENT_MODES = ('read', 'grab', 'seek')
+
+# 批量模式下识别的视频后缀
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.m4v', '.ts', '.mpg', '.mpeg')
+
+# 输出图片格式
+IMAGE_FORMATS = ('jpg', 'png', 'webp')
+
+# letterbox 填充色，与 YOLO 训练时的填充一致
+LETTERBOX_COLOR = 114
+
+
+def resize_image(image, max_side=None, letterbox=None):
+    """
+    在内存中缩放图片：
+    max_side  : 最长边超过该值时等比例缩小，不放大
+    letterbox : (宽, 高)，等比例缩放后居中填充到固定尺寸，优先于 max_side
+    """
+    h, w = image.shape[:2]
+    if letterbox:
+        dst_w, dst_h = letterbox
+        scale = min(dst_w / w, dst_h / h)
+    elif max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+    else:
+        return image
+
+    new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    resized = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+    if not letterbox:
+        return resized
+
+    canvas = np.full((dst_h, dst_w) + image.shape[2:], LETTERBOX_COLOR, dtype=image.dtype)
+    top, left = (dst_h - new_h) // 2, (dst_w - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return canvas
+
+
+def encode_params(img_format='jpg', quality=None):
+    """根据输出格式与质量生成 cv2.imencode 的参数"""
+    if quality is None:
+        return []
+    if img_format == 'jpg':
+        return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    if img_format == 'webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+    return []  # png 为无损格式，质量参数不生效
+
+
+def save_image(image, folder, num, img_format='jpg', quality=None, max_side=None, letterbox=None):
     # 拼接图片完整路径，文件名为“00001.jpg”格式（五位数字）
-    filename = str(num).zfill(5) + '.jpg'
+    filename = str(num).zfill(5) + '.' + img_format
     address = os.path.join(folder, filename)
+    image = resize_image(image, max_side, letterbox)
     # 通过 imencode 编码图片，再用二进制写入文件，解决中文路径问题
-    result, encoded_img = cv2.imencode('.jpg', image)
+    result, encoded_img = cv2.imencode('.' + img_format, image, encode_params(img_format, quality))
     if result:
         with open(address, mode='wb') as f:
             f.write(encoded_img.tobytes())
     else:
         print(f"编码图片失败：{address}")
+    return result
+
+
+def _save_worker(task_queue, folder, failed, save_options):
+    """编码写盘线程：不断从队列取出 (编号, 帧) 进行缩放、编码与写入，遇到 None 退出"""
+    while True:
+        item = task_queue.get()
+        if item is None:
+            break
+        num, frame = item
+        try:
+            if not save_image(frame, folder, num, **save_options):
+                failed.append(num)
+        except Exception as e:
+            print(f"保存图片 {str(num).zfill(5)} 失败: {e}")
+            failed.append(num)
+
+def _count_decoded(stats):
+    if stats is not None:
+        stats['decoded'] = stats.get('decoded', 0) + 1
+
+
+def iter_frames(videoCapture, timeF, mode='grab', begin=0, end=None, stats=None):
+    """
+    按帧间隔产出需要保存的帧 (cnt, frame)，cnt 为从 1 开始的帧序号，
+    与旧版一致：cnt 能被 timeF 整除的帧会被保存。
+    begin/end 用于分段处理，只处理帧序号在 (begin, end] 范围内的帧，end 为 None 表示直到视频结束。
+    stats 字典中累计 'decoded' 从视频中读取（解码）的帧数，seek 模式只统计定位后读取的帧。
+    """
+    if mode in ('read', 'grab') and begin > 0:
+        videoCapture.set(cv2.CAP_PROP_POS_FRAMES, begin)
+    cnt = begin
+
+    if mode == 'read':
+        while end is None or cnt < end:
+            success, frame = videoCapture.read()
+            if not success:
+                break
+            _count_decoded(stats)
+            cnt += 1
+            if cnt % timeF == 0:
+                yield cnt, frame
+
+    elif mode == 'grab':
+        # grab() 只解复用并推进码流，retrieve() 才做解码后的颜色转换与拷贝
+        while (end is None or cnt < end) and videoCapture.grab():
+            _count_decoded(stats)
+            cnt += 1
+            if cnt % timeF == 0:
+                success, frame = videoCapture.retrieve()
+                if not success:
+                    break
+                yield cnt, frame
+
+    elif mode == 'seek':
+        total = int(videoCapture.get(cv2.CAP_PROP_FRAME_COUNT))
+        cnt = (begin // timeF + 1) * timeF
+        # 部分容器拿不到总帧数（返回0或负数），此时一直定位直到读取失败
+        while (total <= 0 or cnt <= total) and (end is None or cnt <= end):
+            videoCapture.set(cv2.CAP_PROP_POS_FRAMES, cnt - 1)
+            success, frame = videoCapture.read()
+            if not success:
+                break
+            _count_decoded(stats)
+            yield cnt, frame
+            cnt += timeF
+
+
+def normalize_ranges(ranges):
+    """
+    整理时间范围列表 [[开始秒, 结束秒], ...]：校验、排序并合并重叠区间，避免同一帧被保存两次。
+    区间不合法时抛出 ValueError。
+    """
+    merged = []
+    for t_start, t_end in sorted((float(a), float(b)) for a, b in ranges):
+        if t_start < 0 or t_end <= t_start:
+            raise ValueError(f"无效的时间范围 [{t_start}, {t_end}]")
+        if merged and t_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], t_end)
+        else:
+            merged.append([t_start, t_end])
+    return [tuple(r) for r in merged]
+
+
+def iter_range_frames(videoCapture, timeF, mode, ranges, stats=None):
+    """
+    只在给定时间范围内抽帧：按帧率把每个区间换算成帧序号范围，定位到区间起点后按 timeF 抽帧，
+    区间之外的部分完全不解码。保存哪些帧与全片抽帧时一致（帧序号能被 timeF 整除）。
+    """
+    fps = videoCapture.get(cv2.CAP_PROP_FPS)
+    if fps <= 0:
+        raise IOError("无法获取视频帧率，不能按时间范围抽帧")
+    for t_start, t_end in ranges:
+        # 第 i 帧（从0开始）的时间为 i / fps，对应帧序号 cnt = i + 1
+        begin = math.ceil(t_start * fps)
+        end = math.floor(t_end * fps) + 1
+        yield from iter_frames(videoCapture, timeF, mode, begin, end, stats)
+
+
+def iter_keyframes(input_video, ranges=None, stats=None):
+    """
+    只解码关键帧：借助 PyAV 让解码器跳过所有非关键帧，产出 (cnt, frame)，
+    cnt 为根据时间戳换算的近似帧序号，frame 为 BGR 格式，可直接交给 cv2 编码。
+    ranges 不为空时只产出这些时间范围内的关键帧。stats 字典中累计 'decoded' 解码的关键帧数。
+    """
+    try:
+        import av
+    except ImportError:
+        raise ImportError("关键帧模式需要安装 PyAV：pip install av")
+
+    with av.open(input_video) as container:
+        stream = container.streams.video[0]
+        stream.codec_context.skip_frame = 'NONKEY'
+        fps = float(stream.average_rate or 0)
+        for t_start, t_end in (ranges or [(0.0, None)]):
+            if t_start > 0:
+                container.seek(int(t_start / stream.time_base), stream=stream, backward=True)
+            for frame in container.decode(stream):
+                _count_decoded(stats)
+                if frame.time is None or frame.time < t_start:
+                    continue
+                if t_end is not None and frame.time > t_end:
+                    break
+                cnt = int(round(frame.time * fps)) + 1 if fps > 0 else frame.index + 1
+                yield cnt, frame.to_ndarray(format='bgr24')
+
+
+def frame_signature(frame, hash_size=8):
+    """
+    计算帧的差值哈希(dHash)：先缩小到 (hash_size+1) x hash_size 再转灰度，
+    比较水平相邻像素的大小，得到 hash_size*hash_size 位的布尔数组。
+    """
+    small = cv2.resize(frame, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return (small[:, 1:] > small[:, :-1]).ravel()
+
+
+def dedup_frames(frames, threshold, hash_size=8, stats=None):
+    """
+    过滤近重复帧：与上一张保留帧的哈希汉明距离 <= threshold 的帧被丢弃，
+    丢弃发生在编码之前，不产生任何磁盘读写。stats 字典中累计 'skipped' 丢弃数量。
+    """
+    last_signature = None
+    for cnt, frame in frames:
+        signature = frame_signature(frame, hash_size)
+        if last_signature is not None and np.count_nonzero(signature != last_signature) <= threshold:
+            if stats is not None:
+                stats['skipped'] = stats.get('skipped', 0) + 1
+            continue
+        last_signature = signature
+        yield cnt, frame
+
+
+def save_frames(frames, images_dir, start, workers=4, queue_size=16, verbose=True, save_options=None):
+    """
+    将 frames 产出的 (cnt, frame) 依次编号为 start+1、start+2... 并保存。
+    workers > 0 时当前线程只负责解码，由 workers 个线程并行编码写盘，
+    queue_size 限制队列中待编码的帧数，避免解码过快导致内存暴涨；
+    workers = 0 时在当前线程内逐帧编码写盘。verbose 为 False 时不逐帧打印。
+    save_options 为传给 save_image 的输出选项（img_format、quality、max_side、letterbox）。
+    返回 (保存数量, 最后处理到的帧序号, 失败编号列表)。
+    """
+    saved, last_cnt, failed = 0, 0, []
+    save_options = save_options or {}
+
+    if workers <= 0:
+        for cnt, frame in frames:
+            start += 1
+            if not save_image(frame, images_dir, start, **save_options):
+                failed.append(start)
+            saved += 1
+            last_cnt = cnt
+            if verbose:
+                print('save image:', cnt, 'Picture name:', str(start).zfill(5))
+        return saved, last_cnt, failed
+
+    task_queue = queue.Queue(maxsize=max(1, queue_size))
+    threads = [threading.Thread(target=_save_worker, args=(task_queue, images_dir, failed, save_options),
+                                daemon=True)
+               for _ in range(workers)]
+    for t in threads:
+        t.start()
+    try:
+        for cnt, frame in frames:
+            start += 1
+            task_queue.put((start, frame))  # 队列已满时阻塞，等待编码线程消化
+            saved += 1
+            last_cnt = cnt
+            if verbose:
+                print('save image:', cnt, 'Picture name:', str(start).zfill(5))
+    finally:
+        # 无论解码是否异常，都通知所有编码线程退出，并等待已入队的帧写完
+        for _ in threads:
+            task_queue.put(None)
+        for t in threads:
+            t.join()
+    return saved, last_cnt, failed
+
+
+def extract_video(input_video, images_dir, start, timeF, mode='grab', workers=4, queue_size=16, verbose=True,
+                  dedup_threshold=None, ranges=None, save_options=None):
+    """
+    从单个视频中抽帧保存到 images_dir，编号从 start+1 开始。
+    dedup_threshold 不为 None 时启用近重复帧过滤（dHash 汉明距离阈值，0-64）。
+    ranges 为时间范围列表 [[开始秒, 结束秒], ...]，不为空时只处理这些区间。
+    save_options 为输出选项，见 make_save_options。
+    视频无法打开时抛出 IOError，时间范围不合法时抛出 ValueError，关键帧模式缺少 PyAV 时抛出 ImportError。
+    返回结果字典：decoded 从视频中解码的帧数、saved 保存数量、last_cnt 最后一张保存帧的帧序号、
+    failed 失败编号列表、skipped 过滤掉的近重复帧数量、elapsed 用时秒数。
+    """
+    ranges = normalize_ranges(ranges) if ranges else None
+    videoCapture = None
+    if mode != 'key':
+        videoCapture = cv2.VideoCapture(input_video)
+        if not videoCapture.isOpened():
+            raise IOError(f"无法打开视频文件 {input_video}")
+    # 如果 images 目录不存在，则创建
+    if not os.path.exists(images_dir):
+        os.makedirs(images_dir)
+
+    stats = {'decoded': 0, 'skipped': 0}
+    t0 = time.perf_counter()
+    try:
+        if mode == 'key':
+            frames = iter_keyframes(input_video, ranges, stats)
+        elif ranges:
+            frames = iter_range_frames(videoCapture, timeF, mode, ranges, stats)
+        else:
+            frames = iter_frames(videoCapture, timeF, mode, stats=stats)
+        if dedup_threshold is not None:
+            frames = dedup_frames(frames, dedup_threshold, stats=stats)
+        saved, last_cnt, failed = save_frames(frames, images_dir, start, workers, queue_size, verbose, save_options)
+    finally:
+        if videoCapture is not None:
+            videoCapture.release()
+    stats.update(saved=saved, last_cnt=last_cnt, failed=failed,
+                 elapsed=max(time.perf_counter() - t0, 1e-6))
+    return stats
+
+
+def format_summary(result):
+    """生成抽帧结果摘要，解码的帧数与保存的图片数分别统计，吞吐量也分别计算"""
+    elapsed = result['elapsed']
+    summary = (f"解码 {result['decoded']} 帧，保存 {result['saved'] - len(result['failed'])} 张图片，"
+               f"失败 {len(result['failed'])} 张，")
+    if result.get('skipped'):
+        summary += f"过滤近重复帧 {result['skipped']} 张，"
+    return summary + (f"用时 {elapsed:.2f} 秒，解码 {result['decoded'] / elapsed:.1f} 帧/秒，"
+                      f"保存 {result['saved'] / elapsed:.1f} 张/秒")
+
+
+def make_save_options(img_format='jpg', quality=None, max_side=None, letterbox=None):
+    """
+    校验并打包输出选项，不合法时抛出 ValueError。
+    img_format : 'jpg'、'png' 或 'webp'
+    quality    : jpg/webp 质量 1-100，None 为 OpenCV 默认值
+    max_side   : 最长边上限（像素），None 表示不缩放
+    letterbox  : 整数 n 表示 n x n，或 (宽, 高)，等比例缩放并填充到固定尺寸
+    """
+    img_format = img_format.lower().lstrip('.')
+    if img_format == 'jpeg':
+        img_format = 'jpg'
+    if img_format not in IMAGE_FORMATS:
+        raise ValueError(f"不支持的输出格式 {img_format}，可选：{', '.join(IMAGE_FORMATS)}")
+    if quality is not None and not 1 <= quality <= 100:
+        raise ValueError("图片质量必须在1到100之间")
+    if max_side is not None and max_side <= 0:
+        raise ValueError("最长边必须为正整数")
+    if isinstance(letterbox, int):
+        letterbox = (letterbox, letterbox)
+    if letterbox is not None and (len(letterbox) != 2 or min(letterbox) <= 0):
+        raise ValueError("letterbox 尺寸必须为正整数 (宽, 高)")
+    return dict(img_format=img_format, quality=quality, max_side=max_side,
+                letterbox=tuple(letterbox) if letterbox else None)
+
+
+def _validate_options(mode, timeF, dedup_threshold=None, ranges=None, img_format='jpg', quality=None,
+                      max_side=None, letterbox=None, modes=EXTRACT_MODES):
+    """
+    main、batch_main、segment_main 共用的参数校验：抽帧模式、帧间隔、近重复阈值、时间范围与输出选项。
+    返回 (整理后的时间范围, 输出选项)，参数不合法时抛出 ValueError。
+    """
+    if mode not in modes:
+        raise ValueError(f"无效的抽帧模式 {mode}，可选：{', '.join(modes)}")
+    if timeF <= 0:
+        raise ValueError("帧间隔必须为正整数。")
+    if dedup_threshold is not None and not 0 <= dedup_threshold <= 64:
+        raise ValueError("近重复帧过滤阈值必须在0到64之间")
+    ranges = normalize_ranges(ranges) if ranges else None
+    return ranges, make_save_options(img_format, quality, max_side, letterbox)
+
+
+def main(input_video, start, timeF, mode='grab', workers=4, queue_size=16, dedup_threshold=None, ranges=None,
+         img_format='jpg', quality=None, max_side=None, letterbox=None):
+    try:
+        ranges, save_options = _validate_options(mode, timeF, dedup_threshold, ranges,
+                                                 img_format, quality, max_side, letterbox)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
 
-def main(input_video, start, timeF):
-    # 读取视频文件
-    videoCapture = cv2.VideoCapture(input_video)
     # 获取视频所在的目录
     video_dir = os.path.dirname(input_video)
     # 定义保存图片的目录为视频所在目录下的 images 文件夹
     images_dir = os.path.join(video_dir, "images")
-    # 如果 images 目录不存在，则创建
+
+    try:
+        result = extract_video(input_video, images_dir, start, timeF, mode, workers, queue_size,
+                               dedup_threshold=dedup_threshold, ranges=ranges, save_options=save_options)
+    except (IOError, ValueError, ImportError) as e:
+        print(f"错误: {e}")
+        return
+    print("抽帧完成：" + format_summary(result))
+
+
+# ------------------ 批量模式 ------------------
+def collect_videos(inputs):
+    """inputs 可以是文件夹路径或视频路径列表，返回排序后的视频路径列表"""
+    if isinstance(inputs, str):
+        if os.path.isdir(inputs):
+            return sorted(os.path.join(inputs, f) for f in os.listdir(inputs)
+                          if f.lower().endswith(VIDEO_EXTENSIONS) and os.path.isfile(os.path.join(inputs, f)))
+        inputs = [inputs]
+    # 列表输入原样保留，不存在的文件会在处理时作为失败项报告
+    return list(inputs)
+
+
+def _batch_output_dirs(videos, output_root):
+    """
+    为每个视频分配独立的输出子文件夹，默认以视频主文件名命名。主文件名重复时依次尝试：
+    改用相对于这些视频共同上级文件夹的路径（如 a/clip.avi -> a_clip）、追加后缀名（clip_avi）、追加序号（clip_2），
+    直到所有文件夹名互不相同（不区分大小写，兼容 Windows）。
+    """
+    def clashes(names):
+        counts = Counter(name.lower() for name in names)
+        return [counts[name.lower()] > 1 for name in names]
+
+    paths = [os.path.abspath(v) for v in videos]
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    if any(clashes(names)):
+        try:
+            root = os.path.commonpath([os.path.dirname(p) for p in paths])
+        except ValueError:  # 不同盘符
+            root = ''
+        for i, clash in enumerate(clashes(names)):
+            if clash:
+                rel = os.path.relpath(paths[i], root) if root else os.path.splitdrive(paths[i])[1]
+                names[i] = os.path.splitext(rel)[0].strip(os.sep).replace(os.sep, '_')
+        for i, clash in enumerate(clashes(names)):
+            if clash:
+                names[i] += '_' + os.path.splitext(paths[i])[1].lstrip('.')
+        seen = Counter()
+        for i, clash in enumerate(clashes(names)):
+            if clash:
+                seen[names[i].lower()] += 1
+                if seen[names[i].lower()] > 1:
+                    names[i] += f"_{seen[names[i].lower()]}"
+    dirs = [os.path.join(output_root, name) for name in names]
+    if any(clashes(dirs)):
+        raise ValueError("无法为每个视频分配独立的输出文件夹")
+    return dirs
+
+
+def _batch_worker(input_video, images_dir, start, timeF, options):
+    """子进程入口：异常转为返回值，保证单个视频失败不会中断整个批次"""
+    try:
+        return True, extract_video(input_video, images_dir, start, timeF, verbose=False, **options)
+    except Exception as e:
+        return False, str(e)
+
+
+def batch_main(inputs, start, timeF, mode='grab', processes=None, workers=2, queue_size=16, output_root=None,
+               dedup_threshold=None, ranges=None, img_format='jpg', quality=None, max_side=None, letterbox=None):
+    """
+    批量抽帧：inputs 为视频文件夹或视频路径列表，每个视频分配给进程池中的一个进程处理。
+    每个视频的图片保存到 output_root/<视频名>/ 下（同名视频的文件夹名见 _batch_output_dirs），编号都从 start+1 开始；
+    output_root 默认为视频所在目录（文件夹输入）或第一个视频所在目录下的 images 文件夹。
+    processes 为进程数（默认 CPU 核数），workers 为每个进程内的编码写盘线程数。
+    其余参数与 main 相同。
+    """
+    try:
+        ranges, save_options = _validate_options(mode, timeF, dedup_threshold, ranges,
+                                                 img_format, quality, max_side, letterbox)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
+
+    videos = collect_videos(inputs)
+    if not videos:
+        print("没有找到视频文件，请检查输入路径。")
+        return
+    if output_root is None:
+        base = inputs if isinstance(inputs, str) and os.path.isdir(inputs) else os.path.dirname(videos[0])
+        output_root = os.path.join(base, "images")
+    try:
+        out_dirs = _batch_output_dirs(videos, output_root)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
+    processes = processes or os.cpu_count() or 1
+    options = dict(mode=mode, workers=workers, queue_size=queue_size, dedup_threshold=dedup_threshold, ranges=ranges,
+                   save_options=save_options)
+
+    print(f"共 {len(videos)} 个视频，使用 {min(processes, len(videos))} 个进程处理，输出目录：{output_root}")
+    t0 = time.perf_counter()
+    total_saved, total_decoded, failures = 0, 0, []
+    with ProcessPoolExecutor(max_workers=min(processes, len(videos))) as executor:
+        futures = {executor.submit(_batch_worker, video, out_dir, start, timeF, options): video
+                   for video, out_dir in zip(videos, out_dirs)}
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                ok, result = future.result()
+            except Exception as e:  # 子进程意外退出等情况
+                ok, result = False, str(e)
+            if ok:
+                total_saved += result['saved'] - len(result['failed'])
+                total_decoded += result['decoded']
+                print(f"完成: {video}，" + format_summary(result))
+            else:
+                failures.append((video, result))
+                print(f"失败: {video}，原因: {result}")
+
+    elapsed = max(time.perf_counter() - t0, 1e-6)
+    print(f"批量抽帧完成：成功 {len(videos) - len(failures)} 个，失败 {len(failures)} 个，"
+          f"共解码 {total_decoded} 帧，保存 {total_saved} 张图片，用时 {elapsed:.2f} 秒，"
+          f"解码 {total_decoded / elapsed:.1f} 帧/秒，保存 {total_saved / elapsed:.1f} 张/秒")
+    for video, reason in failures:
+        print(f"失败视频: {video}，原因: {reason}")
+
+
+# ------------------ 分段并行模式 ------------------
+def plan_segments(total_frames, timeF, segments):
+    """
+    把帧序号 (0, total_frames] 切分为若干段 [(begin, end), ...]，分段边界对齐到 timeF 的整数倍，
+    保证每一帧是否被保存、保存时的编号都与顺序运行一致；最后一段 end 为 None，一直处理到视频结束，
+    以免帧数元数据偏小时漏帧。
+    """
+    per = -(-total_frames // max(1, segments))  # 向上取整
+    per = max(timeF, -(-per // timeF) * timeF)  # 对齐到 timeF 的整数倍
+    bounds = list(range(0, total_frames, per))
+    return [(b, b + per if i < len(bounds) - 1 else None) for i, b in enumerate(bounds)]
+
+
+def _segment_worker(input_video, images_dir, start, timeF, mode, begin, end, workers, queue_size, save_options):
+    """子进程入口：定位到 begin 处，只处理 (begin, end] 范围内的帧，编号从 start + begin // timeF + 1 开始"""
+    try:
+        videoCapture = cv2.VideoCapture(input_video)
+        if not videoCapture.isOpened():
+            raise IOError(f"无法打开视频文件 {input_video}")
+        stats = {'decoded': 0}
+        try:
+            saved, last_cnt, failed = save_frames(iter_frames(videoCapture, timeF, mode, begin, end, stats),
+                                                  images_dir, start + begin // timeF, workers, queue_size,
+                                                  verbose=False, save_options=save_options)
+        finally:
+            videoCapture.release()
+        return True, dict(decoded=stats['decoded'], saved=saved, last_cnt=last_cnt, failed=failed)
+    except Exception as e:
+        return False, str(e)
+
+
+def segment_main(input_video, start, timeF, mode='grab', processes=None, workers=2, queue_size=16,
+                 img_format='jpg', quality=None, max_side=None, letterbox=None):
+    """
+    分段并行抽帧：根据视频的总帧数与帧率把视频切分为 processes 段，每段在独立进程中定位并解码，
+    输出文件名与编号与 main 顺序运行完全一致。拿不到总帧数时退回顺序处理。
+    注意：定位精度依赖容器与解码后端，帧数元数据不准确的视频建议使用顺序模式。
+    """
+    try:
+        _, save_options = _validate_options(mode, timeF, img_format=img_format, quality=quality, max_side=max_side,
+                                            letterbox=letterbox, modes=SEGMENT_MODES)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
+
+    videoCapture = cv2.VideoCapture(input_video)
+    if not videoCapture.isOpened():
+        print(f"错误: 无法打开视频文件 {input_video}")
+        return
+    total_frames = int(videoCapture.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = videoCapture.get(cv2.CAP_PROP_FPS)
+    videoCapture.release()
+
+    processes = processes or os.cpu_count() or 1
+    if total_frames <= 0:
+        print("警告: 无法获取视频总帧数，改为顺序处理。")
+        main(input_video, start, timeF, mode, workers, queue_size, **save_options)
+        return
+
+    images_dir = os.path.join(os.path.dirname(input_video), "images")
     if not os.path.exists(images_dir):
         os.makedirs(images_dir)
 
-    # 读取第一帧
-    success, frame = videoCapture.read()
-    cnt = 0  # 计数器
+    segments = plan_segments(total_frames, timeF, processes)
+    print(f"视频共 {total_frames} 帧，切分为 {len(segments)} 段并行处理：")
+    for begin, end in segments:
+        end_frame = total_frames if end is None else end
+        first_name = str(start + begin // timeF + 1).zfill(5)
+        if fps > 0:
+            print(f"  第 {begin + 1}-{end_frame} 帧（{begin / fps:.1f}s-{end_frame / fps:.1f}s），编号从 {first_name} 开始")
+        else:
+            print(f"  第 {begin + 1}-{end_frame} 帧，编号从 {first_name} 开始")
+
+    t0 = time.perf_counter()
+    result = dict(decoded=0, saved=0, last_cnt=0, failed=[])
+    errors = []
+    with ProcessPoolExecutor(max_workers=len(segments)) as executor:
+        futures = {executor.submit(_segment_worker, input_video, images_dir, start, timeF, mode,
+                                   begin, end, workers, queue_size, save_options): (begin, end)
+                   for begin, end in segments}
+        for future in as_completed(futures):
+            begin, end = futures[future]
+            end_frame = total_frames if end is None else end
+            try:
+                ok, seg = future.result()
+            except Exception as e:  # 子进程意外退出等情况
+                ok, seg = False, str(e)
+            if ok:
+                result['decoded'] += seg['decoded']
+                result['saved'] += seg['saved']
+                result['failed'] += seg['failed']
+                result['last_cnt'] = max(result['last_cnt'], seg['last_cnt'])
+                print(f"第 {begin + 1}-{end_frame} 帧处理完成，保存 {seg['saved']} 张图片")
+            else:
+                errors.append((begin, end_frame, seg))
+                print(f"第 {begin + 1}-{end_frame} 帧处理失败，原因: {seg}")
+    result['elapsed'] = max(time.perf_counter() - t0, 1e-6)
+
+    print("分段抽帧完成：" + format_summary(result))
+    if errors:
+        print(f"警告: {len(errors)} 个分段处理失败，输出不完整，请改用顺序模式重新处理。")
 
-    while success:
-        cnt += 1
-        if cnt % timeF == 0:
-            start += 1
-            save_image(frame, images_dir, start)  # 保存至 images 文件夹
-            print('save image:', cnt, 'Picture name:', str(start).zfill(5))
-        success, frame = videoCapture.read()
 
 if __name__ == '__main__':
     # 在下面修改输入视频路径、起始数字和每隔多少帧保存一张图片
     input_video = r"C:/Users/test.mp4"
     start = 0  # 文件名起始数字，不包括该数
     timeF = 10     # 每隔 timeF 帧保存一张图片
-    main(input_video, start, timeF)
+    mode = 'grab'  # 抽帧模式：'read'、'grab' 或 'seek'
+    workers = 4    # 编码写盘线程数，0 表示在解码线程内直接保存
+    dedup_threshold = None  # 近重复帧过滤阈值（dHash 汉明距离，例如 5），None 表示不过滤
+    main(input_video, start, timeF, mode, workers, dedup_threshold=dedup_threshold)
+    # 批量模式：处理文件夹下的所有视频
+    # batch_main(r"C:/Users/videos", start, timeF, mode, processes=4)
+    # 分段并行模式：单个长视频切分为多段并行处理
+    # segment_main(input_video, start, timeF, mode, processes=4)
+    # 时间范围模式：只抽取指定时间段（秒）内的帧
+    # main(input_video, start, timeF, mode, workers, ranges=[[10, 20], [35.5, 40]])
+    # 输出选项：letterbox 到 640x640，JPEG 质量 90
+    # main(input_video, start, timeF, mode, workers, img_format='jpg', quality=90, letterbox=640)
 
 
 """
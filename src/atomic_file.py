@@ -0,0 +1,57 @@
+"""
+v1.1
+原子写文件，供 CheckLabels、json2txt_v2、LabelIndex、CompareFolders、FindDuplicates 等共用。
+先写入同一目录下的临时文件，写完后用 os.replace 原子替换目标文件，中途中断或崩溃不会留下被截断的文件；
+替换前把临时文件的权限改为原文件的权限，新文件则与普通新建文件一样由当前 umask 决定权限，
+因为 mkstemp 创建的临时文件权限为 0600，直接替换会让共享数据集中的文件变得其他用户不可读。
+v1.1: 临时文件以 0o666 创建、由系统按调用时的 umask 确定权限，不再在导入时调用 os.umask 读取（会短暂修改整个进程的 umask）
+"""
+import os
+import json
+import uuid
+import shutil
+from contextlib import contextmanager
+
+
+def _create_temp(folder):
+    """在 folder 中新建一个不存在的临时文件，返回 (文件描述符, 路径)；权限为 0o666 去掉当前 umask，与普通新建文件相同"""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        tmp_path = os.path.join(folder, f".{uuid.uuid4().hex}.tmp")
+        try:
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+@contextmanager
+def atomic_open(file_path, mode='w', encoding='utf-8'):
+    """
+    以 with 语句打开临时文件供写入，正常结束时原子替换 file_path，出错时删除临时文件。mode 为 'w' 或 'wb'。
+    所在文件夹不存在时自动创建（例如 .cache 缓存文件夹）。
+    """
+    folder = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = _create_temp(folder)
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(file_path, lines):
+    """原子写入文本行"""
+    with atomic_open(file_path) as f:
+        f.writelines(lines)
+
+
+def atomic_save_json(file_path, data):
+    """原子写入 json"""
+    with atomic_open(file_path) as f:
+        json.dump(data, f, ensure_ascii=False)
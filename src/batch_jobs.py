@@ -0,0 +1,50 @@
+"""
+v1.0
+批量处理的公共函数，供 json2txt_v2、label_convert、json2xml、CheckLabels、ValidateLabels、LabelIndex、FindDuplicates 等共用：
+map_chunks 把文件列表分块交给进程池处理并打印进度；print_warning_report 按类型汇总打印 (类型, 文件, 说明) 形式的警告。
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def split_chunks(items, chunk_size=256):
+    return [items[i:i + chunk_size] for i in range(0, len(items), max(1, chunk_size))]
+
+
+def map_chunks(func, items, workers, chunk_size=256, args=(), label="进度", progress_every=1):
+    """
+    把 items 按 chunk_size 分块，由 workers 个进程分别执行 func(块, *args)，返回与各块顺序一致的结果列表。
+    func 必须是模块顶层函数（子进程需要能够导入）。每完成 progress_every 块打印一次进度，label 为 None 时不打印。
+    workers 不大于 0 时在当前进程中逐块执行。
+    """
+    chunks = split_chunks(items, chunk_size)
+    if workers <= 0:
+        return [func(chunk, *args) for chunk in chunks]
+    results = [None] * len(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(func, chunk, *args): i for i, chunk in enumerate(chunks)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if label is not None and (done % progress_every == 0 or done == len(chunks)):
+                print(f"{label}：{done}/{len(chunks)} 块")
+    return results
+
+
+def print_warning_report(warnings, kinds, limit=20):
+    """
+    按类型汇总打印警告 [(类型, 文件, 说明)]，kinds 为 {类型: 说明}；
+    未知标签额外统计出现次数，详细条目最多打印 limit 条
+    """
+    if not warnings:
+        print("没有警告。")
+        return
+    print(f"共 {len(warnings)} 条警告：")
+    for kind, count in Counter(w[0] for w in warnings).most_common():
+        print(f"  {kinds.get(kind, kind)}：{count} 条，涉及 {len({w[1] for w in warnings if w[0] == kind})} 个文件")
+    unknown = Counter(w[2] for w in warnings if w[0] == 'unknown_label')
+    if unknown:
+        print("  未映射的标签：" + "，".join(f"{label}({count})" for label, count in unknown.most_common()))
+    for kind, path, detail in warnings[:limit]:
+        print(f"  [{kinds.get(kind, kind)}] {path} {detail}")
+    if len(warnings) > limit:
+        print(f"  ……其余 {len(warnings) - limit} 条省略")
@@ -0,0 +1,322 @@
+"""
+v1.2
+COCO 格式（instances_*.json）转换为 YOLO 适用的 txt 格式
+COCO 导出文件往往有好几个 GB，直接 json.load 会耗尽内存，这里按块流式解析：
+images 只保留 图片id -> (宽, 高, 文件名) 的紧凑索引，categories 建立类别映射，
+annotations 逐条读取并按图片分组缓存，缓存达到上限就追加写入对应的 txt 文件，
+因此内存峰值只取决于图片数量与缓存上限，与文件大小无关。
+若 annotations 出现在 images/categories 之前，会再读一遍文件只处理 annotations。
+标注文件默认按图片的主文件名命名；不同文件夹下有同名图片（如 a/1.jpg 与 b/1.jpg）时，
+所有标注文件改为保留 file_name 中的文件夹部分（a/1.txt、b/1.txt），避免不同图片的标注被合并到同一个文件。
+
+v1.1: 检测不同文件夹下的同名图片，出现时保留文件夹部分并给出提示，不再把它们的标注静默写入同一个 txt
+v1.2: 指定类别映射时 classes.txt 按编号写出（第 N 行为编号 N 的类别名），编号不连续时不再错位
+"""
+import os
+import json
+import codecs
+from collections import Counter, defaultdict
+
+try:
+    from .label_convert import class_names_from_mapping
+except ImportError:
+    # 直接运行本文件时
+    from label_convert import class_names_from_mapping
+
+# 每次读取的字节数
+CHUNK_SIZE = 1 << 20
+
+# 缓存的标注行数上限，超过后写入文件并清空缓存
+MAX_BUFFERED_LINES = 200000
+
+_WHITESPACE = ' \t\r\n'
+
+
+class JsonStream:
+    """按块读取 json 文本，配合 JSONDecoder.raw_decode 逐个解析值，缓冲区只保留尚未处理的部分"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+
+    def _fill(self):
+        """读入下一块数据，已处理的部分从缓冲区丢弃；到达文件末尾时返回 False"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + self.decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符（不消费），文件结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"JSON 格式错误：期望 '{ch}'，位置附近内容为 {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def value(self):
+        """解析下一个完整的值；值被块边界截断时继续读入数据后重试"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.json_decoder.raw_decode(self.buf, self.pos)
+                # 数字可能恰好在块边界被截断，确认后面还有分隔符再返回
+                if end < len(self.buf) or not isinstance(obj, (int, float)):
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                pass
+            if not self._fill():
+                obj, end = self.json_decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return obj
+
+    def iter_array(self):
+        """逐个产出数组中的元素，调用前数组的 '[' 尚未消费"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            ch = self.peek()
+            self.pos += 1
+            if ch == ']':
+                return
+            if ch != ',':
+                raise ValueError(f"JSON 格式错误：数组元素之间期望 ','，实际为 {ch!r}")
+
+    def iter_top_level(self, wanted):
+        """
+        遍历顶层对象：键在 wanted 中且值为数组时逐个产出 (键, 元素)；
+        其余数组逐个解析后丢弃（不会整体读入内存），其余值解析后丢弃。
+        每个数组结束时产出 (键, None)，便于调用方知道该部分已读完。
+        """
+        self.expect('{')
+        while True:
+            ch = self.peek()
+            if ch == '}' or ch == '':
+                return
+            if ch == ',':
+                self.pos += 1
+                continue
+            key = self.value()
+            self.expect(':')
+            if self.peek() == '[':
+                for item in self.iter_array():
+                    if key in wanted:
+                        yield key, item
+                yield key, None
+            else:
+                self.value()
+
+
+def coco_box_to_yolo(bbox, width, height):
+    """COCO 的 [左上x, 左上y, 宽, 高]（像素）转换为 YOLO 的归一化 [中心x, 中心y, 宽, 高]"""
+    x, y, w, h = bbox
+    return (x + w / 2.0) / width, (y + h / 2.0) / height, w / width, h / height
+
+
+def label_stem(file_name):
+    """file_name 去掉后缀后的相对路径，统一分隔符并去掉盘符、开头的分隔符以及 . 和 ..，保证写在输出目录之内"""
+    path = os.path.splitdrive(file_name.replace('\\', '/'))[1]
+    parts = [part for part in path.split('/') if part not in ('', '.', '..')]
+    return os.path.splitext(os.path.join(*parts))[0] if parts else ''
+
+
+def resolve_label_names(images):
+    """
+    images 为 {图片id: (宽, 高, 相对路径主文件名)}。
+    没有主文件名相同的图片时，把标注文件名改为只用主文件名（原行为）；否则保留文件夹部分。
+    返回主文件名相同的图片所涉及的 {主文件名: 图片数}。
+    """
+    counts = Counter(os.path.basename(stem) for _, _, stem in images.values())
+    collisions = {stem: count for stem, count in counts.items() if count > 1}
+    if not collisions:
+        for image_id, (width, height, stem) in images.items():
+            images[image_id] = (width, height, os.path.basename(stem))
+    return collisions
+
+
+def build_category_mapping(categories, map=None):
+    """
+    建立 COCO 类别id -> YOLO 类别编号 的映射，以及 YOLO 类别名称列表。
+    map 为 None 时按类别id排序后依次编号为 0..n-1；否则按 {类别名: 编号} 映射，不在 map 中的类别被跳过，
+    名称列表按编号索引（第 N 项为编号 N 的名称），多个类别合并为同一编号时名称用 '/' 连接。
+    """
+    categories = sorted(categories, key=lambda c: c['id'])
+    if map is None:
+        mapping = {c['id']: i for i, c in enumerate(categories)}
+        names = [c['name'] for c in categories]
+    else:
+        mapping = {c['id']: map[c['name']] for c in categories if c['name'] in map}
+        names = class_names_from_mapping(map, merge_shared=True)
+    return mapping, names
+
+
+class _LabelWriter:
+    """按图片分组缓存标注行，达到上限后追加写入；同一次运行中每个文件第一次写入时覆盖旧内容"""
+
+    def __init__(self, output, max_buffered=MAX_BUFFERED_LINES):
+        self.output = output
+        self.max_buffered = max_buffered
+        self.buffers = defaultdict(list)
+        self.buffered = 0
+        self.written = set()
+
+    def add(self, stem, line):
+        self.buffers[stem].append(line)
+        self.buffered += 1
+        if self.buffered >= self.max_buffered:
+            self.flush()
+
+    def flush(self):
+        for stem, lines in self.buffers.items():
+            mode = 'a' if stem in self.written else 'w'
+            path = os.path.join(self.output, stem + '.txt')
+            if mode == 'w' and os.sep in stem:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, mode, encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            self.written.add(stem)
+        self.buffers.clear()
+        self.buffered = 0
+
+
+def _handle_annotation(ann, images, cat_mapping, writer, stats):
+    """把一条标注转换为 YOLO 行并交给 writer，异常情况计入 stats"""
+    if ann.get('iscrowd', 0):
+        stats['iscrowd'] += 1
+        return
+    image = images.get(ann.get('image_id'))
+    if image is None:
+        stats['unknown_image'] += 1
+        return
+    class_id = cat_mapping.get(ann.get('category_id'))
+    if class_id is None:
+        stats['unmapped_category'] += 1
+        return
+    bbox = ann.get('bbox')
+    if not bbox or len(bbox) != 4 or bbox[2] <= 0 or bbox[3] <= 0:
+        stats['invalid_bbox'] += 1
+        return
+    width, height, stem = image
+    cx, cy, w, h = coco_box_to_yolo(bbox, width, height)
+    writer.add(stem, f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}")
+    stats['converted'] += 1
+
+
+def convert_coco_to_yolo(coco_json, output, map=None, write_empty=False, chunk_size=CHUNK_SIZE,
+                         max_buffered=MAX_BUFFERED_LINES):
+    """
+    流式转换 COCO 标注文件，返回统计信息 Counter。
+    map 为 {类别名: 编号}，为 None 时按类别id顺序自动编号；类别名写入输出目录下的 classes.txt。
+    write_empty 为 True 时为没有标注的图片生成空白 txt。
+    不同文件夹下有同名图片时标注文件保留文件夹部分，stats['name_collisions'] 为涉及的主文件名数，
+    stats['collision_examples'] 为其中几个例子。
+    """
+    if map is not None:
+        # 先校验映射，避免读完大文件后才报错
+        class_names_from_mapping(map, merge_shared=True)
+    os.makedirs(output, exist_ok=True)
+    images, categories = {}, []
+    cat_mapping = None
+    writer = _LabelWriter(output, max_buffered)
+    stats = Counter()
+    seen_images = seen_categories = annotations_done = False
+    collisions = {}
+
+    with open(coco_json, 'rb') as f:
+        stream = JsonStream(f, chunk_size)
+        for key, item in stream.iter_top_level({'images', 'categories', 'annotations'}):
+            if item is None:
+                if key == 'images' and not seen_images:
+                    # images 读完后、处理标注之前确定标注文件名
+                    collisions = resolve_label_names(images)
+                seen_images = seen_images or key == 'images'
+                seen_categories = seen_categories or key == 'categories'
+                annotations_done = annotations_done or (key == 'annotations' and seen_images and seen_categories)
+                continue
+            if key == 'images':
+                images[item['id']] = (item['width'], item['height'], label_stem(item['file_name']))
+            elif key == 'categories':
+                categories.append(item)
+            elif seen_images and seen_categories:
+                # images 与 categories 都已读完，标注可以直接在第一遍中处理
+                if cat_mapping is None:
+                    cat_mapping, names = build_category_mapping(categories, map)
+                _handle_annotation(item, images, cat_mapping, writer, stats)
+
+    if cat_mapping is None:
+        cat_mapping, names = build_category_mapping(categories, map)
+    if not annotations_done:
+        # annotations 位于 images/categories 之前，再读一遍只处理 annotations
+        with open(coco_json, 'rb') as f:
+            stream = JsonStream(f, chunk_size)
+            for key, item in stream.iter_top_level({'annotations'}):
+                if item is not None:
+                    _handle_annotation(item, images, cat_mapping, writer, stats)
+    writer.flush()
+
+    if write_empty:
+        for _, _, stem in images.values():
+            if stem not in writer.written:
+                path = os.path.join(output, stem + '.txt')
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'w', encoding='utf-8').close()
+                stats['empty'] += 1
+
+    with open(os.path.join(output, 'classes.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(names) + "\n")
+    stats['images'] = len(images)
+    stats['labeled_images'] = len(writer.written)
+    stats['name_collisions'] = len(collisions)
+    stats['collision_examples'] = sorted(collisions)[:5]
+    return stats
+
+
+def main(coco_json, output, map=None, write_empty=False):
+    if not os.path.isfile(coco_json):
+        print(f"错误: {coco_json} 不是有效的文件路径。")
+        return
+    try:
+        stats = convert_coco_to_yolo(coco_json, output, map, write_empty)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
+    if stats['name_collisions']:
+        print(f"注意: 有 {stats['name_collisions']} 个主文件名被不同文件夹下的多张图片共用"
+              f"（如 {'、'.join(stats['collision_examples'])}），标注文件已按 file_name 保留文件夹部分，"
+              f"请将 txt 与图片按相同的文件夹结构放置。")
+    print(f"转换完成：共 {stats['images']} 张图片，其中 {stats['labeled_images']} 张有标注，"
+          f"写入 {stats['converted']} 条标注，类别名称已写入 {os.path.join(output, 'classes.txt')}")
+    if stats['empty']:
+        print(f"为 {stats['empty']} 张没有标注的图片生成了空白标注文件。")
+    skipped = {'iscrowd': "iscrowd 标注", 'unknown_image': "图片id不存在的标注",
+               'unmapped_category': "类别不在映射中的标注", 'invalid_bbox': "bbox 无效的标注"}
+    for kind, desc in skipped.items():
+        if stats[kind]:
+            print(f"跳过 {desc} {stats[kind]} 条")
+
+
+if __name__ == "__main__":
+    # COCO 标注文件路径
+    coco_json = "C:/Users/Desktop/annotations/instances_train2017.json"
+    # 保存转换后 TXT 文件的文件夹路径
+    txt_folder = "C:/Users/Desktop/labels"
+    # 类别映射，None 表示按 COCO 类别id顺序自动编号
+    label_mapping = None
+    main(coco_json, txt_folder, label_mapping)
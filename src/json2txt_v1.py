@@ -1,11 +1,16 @@
 """
 v1.0
 转换为 YOLO 适用的 txt 格式
-不再维护
+不再维护（读取改用 labelme_reader，跳过 imageData）
 """
-import json
 import os
 
+try:
+    from .labelme_reader import load_labelme
+except ImportError:
+    # 直接运行本文件时
+    from labelme_reader import load_labelme
+
 
 def convert(img_size, box):
     dw = 1. / (img_size[0])
@@ -30,7 +35,7 @@ def decode_json(input, output, json_name, name2id):
     txt_file = open(txt_name, 'w', encoding='utf-8')
 
     json_path = os.path.join(input, json_name)
-    data = json.load(open(json_path, 'r', encoding='gb2312'))
+    data = load_labelme(json_path, encoding='gb2312')
 
     img_w = data['imageWidth']
     img_h = data['imageHeight']
@@ -1,86 +1,330 @@
 """
-v1.0
+v1.5
 转换为 YOLO 适用的 txt 格式
+v1.1: 新增并行模式，文件按块分配给进程池转换，警告统一汇总输出，输出与串行模式逐字节一致
+v1.2: 使用 labelme_reader 读取，跳过 imageData 中的整图 base64，大文件解析更快、内存占用更小
+v1.3: 新增增量模式，在输出文件夹旁记录清单（每个源文件的修改时间/大小，可选内容哈希），
+      只转换新增或修改过的 json，并删除源文件已不存在的输出
+v1.4: 新增输出模式：多边形/圆形转外接检测框、YOLO 分割格式，每个文件的坐标统一用 NumPy 数组归一化
+v1.5: 增量模式的清单移到输出文件夹内的 .cache/manifest.json，不再写入上级目录
 """
 import os
-import json
 import glob
+import json
+import hashlib
+import numpy as np
+
+try:
+    from .labelme_reader import load_labelme
+    from .batch_jobs import map_chunks, print_warning_report
+    from .atomic_file import atomic_save_json
+    from .stem_index import cache_path
+except ImportError:
+    # 直接运行本文件时
+    from labelme_reader import load_labelme
+    from batch_jobs import map_chunks, print_warning_report
+    from atomic_file import atomic_save_json
+    from stem_index import cache_path
+
+# 汇总报告中各类警告的说明
+WARNING_KINDS = {
+    'missing_size': "缺少 imageWidth/imageHeight 信息，跳过该文件",
+    'unknown_label': "未在类别映射中找到标签，跳过该标注",
+    'few_points': "标注点数不足，跳过该标注",
+    'error': "读取或转换失败",
+}
+
+# 输出模式：
+# 'rect' : 只把矩形标注转换为检测框（旧版行为，默认）
+# 'box'  : 矩形、多边形、圆形标注都转换为外接检测框
+# 'seg'  : YOLO 分割格式 class x1 y1 x2 y2 ...，多边形原样输出，矩形转为四个角点，圆形近似为多边形
+OUTPUT_MODES = ('rect', 'box', 'seg')
+
+# 'box'/'seg' 模式下处理的标注形状
+SUPPORTED_SHAPES = ('rectangle', 'polygon', 'circle')
+
+# 分割模式下圆形近似为多边形的顶点数
+CIRCLE_VERTICES = 32
+
+
+def shape_to_points(shape_type, points, output_mode):
+    """
+    把单个标注转换为 (N, 2) 的坐标数组：
+    圆形（圆心 + 圆上一点）在检测模式下转为外接框两角点，在分割模式下近似为多边形；
+    矩形在分割模式下转为四个角点；其余原样返回。
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if shape_type == 'circle':
+        center = pts[0]
+        radius = np.hypot(*(pts[1] - pts[0]))
+        if output_mode == 'seg':
+            theta = np.linspace(0, 2 * np.pi, CIRCLE_VERTICES, endpoint=False)
+            return center + radius * np.stack([np.cos(theta), np.sin(theta)], axis=1)
+        return np.stack([center - radius, center + radius])
+    if shape_type == 'rectangle' and output_mode == 'seg':
+        (x1, y1), (x2, y2) = pts.min(axis=0), pts.max(axis=0)
+        return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]])
+    return pts
+
+
+def format_yolo_lines(class_ids, arrays, image_width, image_height, output_mode='rect'):
+    """
+    把一个文件内所有标注的坐标拼成一个数组统一归一化，返回 YOLO 格式的行列表。
+    检测模式用 reduceat 一次求出每个标注的外接框；分割模式把坐标裁剪到 [0, 1]。
+    """
+    if not arrays:
+        return []
+    counts = np.array([len(a) for a in arrays])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    all_points = np.concatenate(arrays)
+    size = np.array([image_width, image_height], dtype=np.float64)
+
+    if output_mode == 'seg':
+        norm = np.clip(all_points / size, 0.0, 1.0)
+        return [f"{class_id} " + " ".join(f"{v:.6f}" for v in coords.ravel().tolist())
+                for class_id, coords in zip(class_ids, np.split(norm, starts[1:]))]
 
+    mins = np.minimum.reduceat(all_points, starts, axis=0)
+    maxs = np.maximum.reduceat(all_points, starts, axis=0)
+    # 与逐点计算时的运算顺序一致：先求中心与宽高，再除以图像尺寸
+    centers = (mins + maxs) / 2.0 / size
+    sizes = (maxs - mins) / size
+    # YOLO 格式：class_id center_x center_y width height（归一化坐标）
+    return [f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+            for class_id, (cx, cy), (w, h) in zip(class_ids, centers.tolist(), sizes.tolist())]
 
-def convert_json_to_yolo(json_path, output_path, label_mapping):
 
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def convert_json_to_yolo(json_path, output_path, label_mapping, warnings=None, output_mode='rect'):
+    """
+    warnings 为 None 时逐条打印警告；传入列表时警告以 (类型, 文件, 说明) 的形式追加到列表中，
+    由调用方统一汇总。output_mode 见 OUTPUT_MODES。返回是否生成了输出文件。
+    """
+    def warn(kind, detail, message):
+        if warnings is None:
+            print(message)
+        else:
+            warnings.append((kind, json_path, detail))
+
+    data = load_labelme(json_path, encoding='utf-8')
 
     # 获取图像的宽度和高度
     image_width = data.get("imageWidth")
     image_height = data.get("imageHeight")
     if image_width is None or image_height is None:
-        print(f"Warning: 文件 {json_path} 中缺少 imageWidth/imageHeight 信息，跳过该文件。")
-        return
+        warn('missing_size', '', f"Warning: 文件 {json_path} 中缺少 imageWidth/imageHeight 信息，跳过该文件。")
+        return False
 
-    lines = []
+    class_ids, arrays = [], []
     for shape in data.get("shapes", []):
-        # 仅处理矩形标注，若有需要，可添加其他形状的处理
-        if shape.get("shape_type") != "rectangle":
-            continue
+        shape_type = shape.get("shape_type")
+        if output_mode == 'rect':
+            # 仅处理矩形标注
+            if shape_type != "rectangle":
+                continue
+        else:
+            # 旧版 labelme 没有 shape_type 字段，默认为多边形
+            shape_type = shape_type or "polygon"
+            if shape_type not in SUPPORTED_SHAPES:
+                continue
 
         label = shape.get("label")
         if label not in label_mapping:
-            print(f"Warning: 在文件 {json_path} 中，未在类别映射中找到标签 {label}，跳过该标注。")
+            warn('unknown_label', label, f"Warning: 在文件 {json_path} 中，未在类别映射中找到标签 {label}，跳过该标注。")
             continue
 
-        # 计算最小和最大的坐标值
         points = shape.get("points", [])
-        if len(points) < 2:
-            print(f"Warning: 文件 {json_path} 中的标注 {shape} 点数不足，跳过。")
+        min_points = 3 if shape_type == "polygon" and output_mode == 'seg' else 2
+        if len(points) < min_points:
+            warn('few_points', label, f"Warning: 文件 {json_path} 中的标注 {shape} 点数不足，跳过。")
             continue
 
-        x_coords = [p[0] for p in points]
-        y_coords = [p[1] for p in points]
-        x_min, x_max = min(x_coords), max(x_coords)
-        y_min, y_max = min(y_coords), max(y_coords)
+        class_ids.append(label_mapping[label])
+        arrays.append(shape_to_points(shape_type, points, output_mode))
 
-        # 计算中心点和宽高
-        center_x = (x_min + x_max) / 2.0
-        center_y = (y_min + y_max) / 2.0
-        bbox_width = x_max - x_min
-        bbox_height = y_max - y_min
-
-        # 归一化
-        center_x_norm = center_x / image_width
-        center_y_norm = center_y / image_height
-        width_norm = bbox_width / image_width
-        height_norm = bbox_height / image_height
-
-        # YOLO 格式：class_id center_x center_y width height（归一化坐标）
-        class_id = label_mapping[label]
-        line = f"{class_id} {center_x_norm:.6f} {center_y_norm:.6f} {width_norm:.6f} {height_norm:.6f}"
-        lines.append(line)
+    lines = format_yolo_lines(class_ids, arrays, image_width, image_height, output_mode)
 
     # 写入输出文件
     with open(output_path, 'w', encoding='utf-8') as f_out:
         for line in lines:
             f_out.write(line + "\n")
-    print(f"转换完成：{json_path} -> {output_path}")
+    if warnings is None:
+        print(f"转换完成：{json_path} -> {output_path}")
+    return True
+
+
+def _convert_chunk(pairs, label_mapping, output_mode='rect'):
+    """子进程入口：转换一块文件，返回 (成功生成输出的 json 路径列表, 警告列表)，单个文件出错不影响同块其他文件"""
+    converted, warnings = [], []
+    for json_file, txt_file in pairs:
+        try:
+            if convert_json_to_yolo(json_file, txt_file, label_mapping, warnings, output_mode):
+                converted.append(json_file)
+        except Exception as e:
+            warnings.append(('error', json_file, str(e)))
+    return converted, warnings
+
+
+def convert_pairs(pairs, label_mapping, workers=0, chunk_size=256, output_mode='rect'):
+    """
+    转换 (json路径, txt路径) 列表，返回 (成功生成输出的 json 路径集合, 出错的 json 路径集合)。
+    workers 为 0 时串行转换并逐条打印；大于 0 时把文件按 chunk_size 分块交给 workers 个进程转换，
+    警告在结束后统一汇总输出。
+    """
+    if workers <= 0:
+        converted = set()
+        # 对每个 JSON 文件进行转换
+        for json_file, txt_file in pairs:
+            if convert_json_to_yolo(json_file, txt_file, label_mapping, output_mode=output_mode):
+                converted.add(json_file)
+        return converted, set()
+
+    converted, warnings = set(), []
+    for chunk_converted, chunk_warnings in map_chunks(_convert_chunk, pairs, workers, chunk_size,
+                                                      (label_mapping, output_mode)):
+        converted.update(chunk_converted)
+        warnings.extend(chunk_warnings)
+
+    # 按文件名排序，使报告顺序稳定
+    warnings.sort(key=lambda w: w[1])
+    print(f"转换完成：共 {len(pairs)} 个文件，成功 {len(converted)} 个，跳过 {len(pairs) - len(converted)} 个。")
+    print_warning_report(warnings, WARNING_KINDS)
+    return converted, {w[1] for w in warnings if w[0] == 'error'}
 
 
-def main(input, output, map):
+# ------------------ 增量模式 ------------------
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output):
+    """清单文件保存在输出文件夹下的缓存文件夹中：<输出文件夹>/.cache/manifest.json，不会混入标签文件"""
+    return cache_path(output, 'manifest.json')
+
+
+def file_digest(path):
+    """计算文件内容哈希，按大块读取"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(path, input, map, output_mode='rect'):
+    """读取清单，输入目录、类别映射或输出模式变化时视为无效，返回 {文件名: 记录}"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print(f"警告: 清单文件 {path} 无法读取，将重新转换全部文件。")
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('input') != os.path.abspath(input) \
+            or manifest.get('mapping') != map or manifest.get('output_mode', 'rect') != output_mode:
+        print("输入目录、类别映射或输出模式已变化，将重新转换全部文件。")
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(path, input, map, files, output_mode='rect'):
+    atomic_save_json(path, {'version': MANIFEST_VERSION, 'input': os.path.abspath(input), 'mapping': map,
+                            'output_mode': output_mode, 'files': files})
+
+
+def incremental_convert(input, output, map, workers=0, chunk_size=256, use_hash=False, output_mode='rect'):
+    """
+    增量转换：与清单对比，修改时间与大小都未变化的文件直接跳过；
+    use_hash 为 True 时，修改时间或大小变化但内容哈希相同的文件同样跳过。
+    源文件已删除的，同时删除对应的输出文件。
+    """
+    path = manifest_path(output)
+    old_files = load_manifest(path, input, map, output_mode)
+
+    # 一次扫描输入与输出目录
+    current = {}
+    with os.scandir(input) as it:
+        for entry in it:
+            if entry.name.endswith('.json') and not entry.name.startswith('.') and entry.is_file():
+                st = entry.stat()
+                current[entry.name] = (st.st_mtime_ns, st.st_size)
+    with os.scandir(output) as it:
+        existing_outputs = {entry.name for entry in it if entry.is_file()}
+
+    files, todo = {}, []
+    for name, (mtime, size) in current.items():
+        record = old_files.get(name)
+        txt_name = os.path.splitext(name)[0] + '.txt'
+        # 之前生成过输出但输出文件被删掉的，需要重新转换
+        if record and (not record['produced'] or txt_name in existing_outputs):
+            if record['mtime'] == mtime and record['size'] == size:
+                files[name] = record
+                continue
+            if use_hash and record.get('hash') and file_digest(os.path.join(input, name)) == record['hash']:
+                files[name] = dict(record, mtime=mtime, size=size)
+                continue
+        todo.append(name)
+
+    removed = [name for name in old_files if name not in current]
+    for name in removed:
+        txt_path = os.path.join(output, os.path.splitext(name)[0] + '.txt')
+        if old_files[name]['produced'] and os.path.exists(txt_path):
+            os.remove(txt_path)
+            print(f"已删除: {txt_path}（源文件已不存在）")
+
+    added = sum(1 for name in todo if name not in old_files)
+    print(f"增量转换：新增 {added} 个，修改 {len(todo) - added} 个，未变化 {len(files)} 个，删除 {len(removed)} 个。")
+
+    pairs = [(os.path.join(input, name), os.path.join(output, os.path.splitext(name)[0] + '.txt')) for name in todo]
+    try:
+        converted, failed = convert_pairs(pairs, map, workers, chunk_size, output_mode) if pairs else (set(), set())
+    except Exception:
+        # 串行模式出错时，保存已确认未变化的记录，其余文件下次重新转换
+        save_manifest(path, input, map, files, output_mode)
+        raise
+
+    for (json_file, txt_file), name in zip(pairs, todo):
+        if json_file in failed:
+            continue  # 出错的文件不记录，下次重试
+        produced = json_file in converted
+        if not produced and os.path.exists(txt_file):
+            os.remove(txt_file)  # 修改后不再生成输出的，删除旧输出
+        mtime, size = current[name]
+        files[name] = {'mtime': mtime, 'size': size, 'produced': produced,
+                       'hash': file_digest(json_file) if use_hash else None}
+    save_manifest(path, input, map, files, output_mode)
+
+
+def main(input, output, map, workers=0, chunk_size=256, incremental=False, use_hash=False, output_mode='rect'):
+    """
+    output_mode 为输出模式：'rect' 仅矩形（默认）、'box' 多边形/圆形也转为检测框、'seg' YOLO 分割格式。
+    workers 为 0 时串行转换并逐条打印；大于 0 时把文件按 chunk_size 分块交给 workers 个进程转换，
+    警告在结束后统一汇总输出。
+    incremental 为 True 时只转换新增或修改过的文件，见 incremental_convert。
+    """
+    if output_mode not in OUTPUT_MODES:
+        print(f"错误: 无效的输出模式 {output_mode}，可选：{', '.join(OUTPUT_MODES)}")
+        return
+
     # 如果输出文件夹不存在，则创建
     if not os.path.exists(output):
         os.makedirs(output)
 
+    if incremental:
+        incremental_convert(input, output, map, workers, chunk_size, use_hash, output_mode)
+        return
+
     # 获取文件夹中所有 .json 文件
     json_files = glob.glob(os.path.join(input, "*.json"))
     if not json_files:
         print("没有找到 JSON 文件，请检查文件夹路径。")
         return
 
-    # 对每个 JSON 文件进行转换
+    pairs = []
     for json_file in json_files:
         base_name = os.path.splitext(os.path.basename(json_file))[0]
         txt_file = os.path.join(output, base_name + ".txt")
-        convert_json_to_yolo(json_file, txt_file, map)
+        pairs.append((json_file, txt_file))
+    convert_pairs(pairs, map, workers, chunk_size, output_mode)
 
 
 if __name__ == "__main__":
@@ -93,4 +337,10 @@ if __name__ == "__main__":
         "line": 0,
         "car": 1
     }
-    main(json_folder, txt_folder, label_mapping)
+    # 并行进程数，0 表示串行
+    workers = 0
+    # 增量模式：只转换新增或修改过的文件
+    incremental = False
+    # 输出模式：'rect' 仅矩形、'box' 多边形/圆形也转为检测框、'seg' YOLO 分割格式
+    output_mode = 'rect'
+    main(json_folder, txt_folder, label_mapping, workers, incremental=incremental, output_mode=output_mode)
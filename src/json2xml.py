@@ -1,17 +1,63 @@
 """
-v0.1
+v0.3
 用于json文件转xml
+v0.2: 使用 labelme_reader 读取，imageData 中的整图 base64 不再读入内存，也不再写入 xml（该节点为空）
+v0.3: 默认输出标准的 Pascal VOC（size、object、bndbox），逐段直接写出，
+      不再经过 dicttoxml 生成、minidom 重新解析、toprettyxml 格式化这三份内存副本，也不再需要 dicttoxml；
+      矩形、多边形、圆形标注都转换为外接框；支持多进程并行转换整个文件夹。
+      旧版的 labelme 字段直接转储保留为 legacy=True（需要 dicttoxml）
 """
 import os
-from json import loads
-from dicttoxml import dicttoxml
-from xml.dom.minidom import parseString
+import numpy as np
+
+try:
+    from .labelme_reader import load_labelme
+    from .json2txt_v2 import shape_to_points
+    from .label_convert import voc_boxes, write_voc_file
+    from .batch_jobs import map_chunks
+except ImportError:
+    # 直接运行本文件时
+    from labelme_reader import load_labelme
+    from json2txt_v2 import shape_to_points
+    from label_convert import voc_boxes, write_voc_file
+    from batch_jobs import map_chunks
+
+# 转换为 bndbox 的标注形状
+VOC_SHAPES = ('rectangle', 'polygon', 'circle')
+
+
+def jsonToVoc(json_path, xml_path):
+    """labelme json 转换为 Pascal VOC xml，返回写出的目标个数"""
+    data = load_labelme(json_path, encoding='UTF-8')
+    width, height = data.get("imageWidth"), data.get("imageHeight")
+    if width is None or height is None:
+        raise ValueError(f"文件 {json_path} 中缺少 imageWidth/imageHeight 信息")
+    stem = os.path.splitext(os.path.basename(json_path))[0]
+    filename = os.path.basename(data.get("imagePath") or stem + '.jpg')
+
+    labels, boxes = [], []
+    for shape in data.get("shapes", []):
+        # 旧版 labelme 没有 shape_type 字段，默认为多边形
+        shape_type = shape.get("shape_type") or "polygon"
+        points = shape.get("points", [])
+        if shape_type not in VOC_SHAPES or len(points) < 2:
+            continue
+        pts = shape_to_points(shape_type, points, 'box')
+        labels.append(str(shape.get("label")))
+        boxes.append(np.concatenate([pts.min(axis=0), pts.max(axis=0)]))
+
+    boxes = voc_boxes(np.array(boxes, dtype=np.float64).reshape(-1, 4), width, height)
+    write_voc_file(xml_path, filename, width, height,
+                   ((label, *box) for label, box in zip(labels, boxes.tolist())))
+    return len(labels)
 
 
 def jsonToXml(json_path, xml_path):
+    """旧版转换：把 labelme json 的全部字段直接转储为 xml（需要 dicttoxml）"""
+    from dicttoxml import dicttoxml
+    from xml.dom.minidom import parseString
 
-    with open(json_path, 'r', encoding='UTF-8') as json_file:
-        load_dict = loads(json_file.read())
+    load_dict = load_labelme(json_path, encoding='UTF-8')
     # print(load_dict)
     my_item_func = lambda x: 'Annotation'
     xml = dicttoxml(load_dict, custom_root='Annotations', item_func=my_item_func, attr_type=False)
@@ -22,15 +68,47 @@ def jsonToXml(json_path, xml_path):
         xml_file.write(dom.toprettyxml())
 
 
-def json_to_xml(json_dir, xml_dir):
+def _convert_chunk(pairs, legacy=False):
+    """子进程入口：转换一块文件，返回 (成功数, 目标总数, [(文件, 错误信息)])，单个文件出错不影响同块其他文件"""
+    converted, objects, errors = 0, 0, []
+    for json_path, xml_path in pairs:
+        try:
+            if legacy:
+                jsonToXml(json_path, xml_path)
+            else:
+                objects += jsonToVoc(json_path, xml_path)
+            converted += 1
+        except Exception as e:
+            errors.append((json_path, str(e)))
+    return converted, objects, errors
+
 
+def json_to_xml(json_dir, xml_dir, workers=0, chunk_size=256, legacy=False):
+    """
+    转换文件夹中所有 json 文件，workers 大于 0 时按 chunk_size 分块交给多个进程并行转换。
+    legacy 为 True 时使用旧版的字段转储格式。
+    """
     if (os.path.exists(xml_dir) == False):
         os.makedirs(xml_dir)
-    dir = os.listdir(json_dir)
-    for file in dir:
+    pairs = []
+    for file in os.listdir(json_dir):
         file_list = file.split(".")
         if (file_list[-1] == 'json'):
-            jsonToXml(os.path.join(json_dir, file), os.path.join(xml_dir, file_list[0] + '.xml'))
+            pairs.append((os.path.join(json_dir, file), os.path.join(xml_dir, file_list[0] + '.xml')))
+
+    if workers <= 0:
+        converted, objects, errors = _convert_chunk(pairs, legacy)
+    else:
+        converted, objects, errors = 0, 0, []
+        for chunk_converted, chunk_objects, chunk_errors in map_chunks(_convert_chunk, pairs, workers, chunk_size,
+                                                                       (legacy,)):
+            converted += chunk_converted
+            objects += chunk_objects
+            errors.extend(chunk_errors)
+
+    for json_path, message in errors:
+        print(f"转换失败：{json_path}，{message}")
+    print(f"转换完成：共 {converted} 个文件，{objects} 个目标，失败 {len(errors)} 个，输出文件夹：{xml_dir}")
 
 
 if __name__ == '__main__':
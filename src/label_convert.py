@@ -0,0 +1,420 @@
+"""
+v1.1
+通用标注格式转换：labelme json、YOLO txt、Pascal VOC xml 之间任意互转
+每种格式一个读取函数和一个写出函数，读取结果统一为 ImageLabels：
+类别编号数组 class_ids (N,) 与像素坐标检测框数组 boxes (N, 4)，格式为 [x1, y1, x2, y2]，
+坐标换算都在整个数组上一次完成，任意两种格式之间的转换只需读一次、写一次。
+labelme -> YOLO 的输出与 json2txt_v2 的 'rect'/'box' 模式逐字节一致。
+
+v1.1: 类别名称列表按编号建立（第 N 项为编号 N 的名称），映射编号不从 0 开始或不连续时不再错位；
+      多个类别名映射到同一编号时报错，避免写出的名称无法对应回编号
+"""
+import os
+import json
+from collections import namedtuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import numpy as np
+
+try:
+    from .labelme_reader import load_labelme
+    from .json2txt_v2 import shape_to_points
+    from .stem_index import build_stem_index
+    from .batch_jobs import map_chunks, print_warning_report
+except ImportError:
+    # 直接运行本文件时
+    from labelme_reader import load_labelme
+    from json2txt_v2 import shape_to_points
+    from stem_index import build_stem_index
+    from batch_jobs import map_chunks, print_warning_report
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# 一张图片的全部标注：filename 为图片文件名，boxes 为像素坐标 [x1, y1, x2, y2]
+ImageLabels = namedtuple('ImageLabels', ['stem', 'filename', 'width', 'height', 'class_ids', 'boxes'])
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff')
+
+# YOLO 标注文件夹中的类别名称文件，不作为标注文件处理
+CLASSES_FILE = 'classes.txt'
+
+
+class LabelError(Exception):
+    """单个标注文件无法转换（缺少图片尺寸、格式错误等）"""
+
+
+def empty_labels(stem, filename, width, height):
+    return ImageLabels(stem, filename, width, height,
+                       np.zeros(0, dtype=np.int64), np.zeros((0, 4), dtype=np.float64))
+
+
+def image_size(image_path):
+    """读取图片的 (宽, 高)；安装了 Pillow 时只读文件头，否则用 OpenCV 解码（支持中文路径）"""
+    if Image is not None:
+        with Image.open(image_path) as img:
+            return img.size
+    import cv2
+    img = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise LabelError(f"无法读取图片 {image_path}")
+    return img.shape[1], img.shape[0]
+
+
+def load_class_names(folder):
+    """读取文件夹中的 classes.txt，不存在时返回 None"""
+    path = os.path.join(folder, CLASSES_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def class_names_from_mapping(label_mapping, merge_shared=False):
+    """
+    由 {类别名: 编号} 建立按编号索引的类别名称列表，第 N 项为编号 N 的名称，写出的 classes.txt 第 N 行即编号 N；
+    映射中没有的编号用编号本身作为名称（与 class_name 一致，空行会被 load_class_names 跳过而导致错位）。
+    多个类别名映射到同一编号时：merge_shared 为 False 抛出 ValueError，为 True 时用 '/' 连接这些名称。
+    编号不是非负整数时抛出 ValueError。
+    """
+    grouped = {}
+    for name, class_id in label_mapping.items():
+        if isinstance(class_id, bool) or not isinstance(class_id, int) or class_id < 0:
+            raise ValueError(f"类别 {name} 的编号 {class_id!r} 不是非负整数")
+        grouped.setdefault(class_id, []).append(name)
+    shared = {class_id: names for class_id, names in grouped.items() if len(names) > 1}
+    if shared and not merge_shared:
+        detail = "；".join(f"{class_id}：{'、'.join(names)}" for class_id, names in sorted(shared.items()))
+        raise ValueError(f"多个类别名映射到同一编号（{detail}），请为每个编号只保留一个类别名")
+    names = [str(i) for i in range(max(grouped) + 1)] if grouped else []
+    for class_id, group in grouped.items():
+        names[class_id] = "/".join(group)
+    return names
+
+
+# ---------------------------- 读取 ----------------------------
+
+def read_labelme(path, options, warn):
+    """
+    读取 labelme json。options['shape_mode'] 为 'rect' 时只读取矩形标注，
+    为 'box' 时多边形、圆形也取外接框（与 json2txt_v2 相同）。
+    """
+    data = load_labelme(path, encoding='utf-8')
+    width, height = data.get("imageWidth"), data.get("imageHeight")
+    if width is None or height is None:
+        raise LabelError("缺少 imageWidth/imageHeight 信息")
+    stem = os.path.splitext(os.path.basename(path))[0]
+    filename = os.path.basename(data.get("imagePath") or stem + '.jpg')
+    label_mapping = options['label_mapping']
+    shape_mode = options.get('shape_mode', 'rect')
+
+    class_ids, arrays = [], []
+    for shape in data.get("shapes", []):
+        shape_type = shape.get("shape_type") or "polygon"
+        if shape_type != "rectangle" and (shape_mode == 'rect' or shape_type not in ('polygon', 'circle')):
+            continue
+        label = shape.get("label")
+        if label not in label_mapping:
+            warn('unknown_label', label)
+            continue
+        points = shape.get("points", [])
+        if len(points) < 2:
+            warn('few_points', label)
+            continue
+        class_ids.append(label_mapping[label])
+        arrays.append(shape_to_points(shape_type, points, 'box'))
+
+    if not arrays:
+        return empty_labels(stem, filename, width, height)
+    # 与 json2txt_v2.format_yolo_lines 相同，用 reduceat 一次求出每个标注的外接框
+    counts = np.array([len(a) for a in arrays])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    all_points = np.concatenate(arrays)
+    boxes = np.hstack([np.minimum.reduceat(all_points, starts, axis=0),
+                       np.maximum.reduceat(all_points, starts, axis=0)])
+    return ImageLabels(stem, filename, width, height, np.array(class_ids, dtype=np.int64), boxes)
+
+
+def read_yolo(path, options, warn):
+    """
+    读取 YOLO txt，图片尺寸从 options['image_paths']（主文件名 -> 图片路径）对应的图片中读取。
+    分割格式的行取多边形的外接框。
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    image_path = options.get('image_paths', {}).get(stem)
+    if image_path is None:
+        raise LabelError("在图片文件夹中找不到对应的图片，无法得到图片尺寸")
+    width, height = image_size(image_path)
+    filename = os.path.basename(image_path)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = [line.split() for line in f if line.strip()]
+    if not rows:
+        return empty_labels(stem, filename, width, height)
+    size = np.array([width, height, width, height], dtype=np.float64)
+
+    if all(len(row) == 5 for row in rows):
+        values = np.array(rows, dtype=np.float64)
+        class_ids = values[:, 0].astype(np.int64)
+        cx, cy, w, h = (values[:, 1:] * size).T
+        boxes = np.stack([cx - w / 2.0, cy - h / 2.0, cx + w / 2.0, cy + h / 2.0], axis=1)
+        return ImageLabels(stem, filename, width, height, class_ids, boxes)
+
+    class_ids, boxes = [], []
+    for row in rows:
+        coords = np.array(row[1:], dtype=np.float64)
+        if len(coords) == 4:
+            cx, cy, w, h = coords
+            box = [cx - w / 2.0, cy - h / 2.0, cx + w / 2.0, cy + h / 2.0]
+        elif len(coords) >= 6 and len(coords) % 2 == 0:
+            pts = coords.reshape(-1, 2)
+            box = np.concatenate([pts.min(axis=0), pts.max(axis=0)])
+        else:
+            warn('bad_line', " ".join(row))
+            continue
+        class_ids.append(int(row[0]))
+        boxes.append(box)
+    if not boxes:
+        return empty_labels(stem, filename, width, height)
+    return ImageLabels(stem, filename, width, height, np.array(class_ids, dtype=np.int64),
+                       np.array(boxes, dtype=np.float64) * size)
+
+
+def read_voc(path, options, warn):
+    """读取 Pascal VOC xml"""
+    root = ElementTree.parse(path).getroot()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    size = root.find('size')
+    if size is None or size.findtext('width') is None or size.findtext('height') is None:
+        raise LabelError("缺少 size/width/height 信息")
+    width, height = int(float(size.findtext('width'))), int(float(size.findtext('height')))
+    filename = root.findtext('filename') or stem + '.jpg'
+    label_mapping = options['label_mapping']
+
+    class_ids, boxes = [], []
+    for obj in root.iter('object'):
+        label = obj.findtext('name')
+        if label not in label_mapping:
+            warn('unknown_label', label)
+            continue
+        bndbox = obj.find('bndbox')
+        if bndbox is None:
+            warn('few_points', label)
+            continue
+        class_ids.append(label_mapping[label])
+        boxes.append([float(bndbox.findtext(k)) for k in ('xmin', 'ymin', 'xmax', 'ymax')])
+    if not boxes:
+        return empty_labels(stem, filename, width, height)
+    return ImageLabels(stem, filename, width, height, np.array(class_ids, dtype=np.int64),
+                       np.array(boxes, dtype=np.float64))
+
+
+# ---------------------------- 写出 ----------------------------
+
+def class_name(class_id, names):
+    """类别编号转名称，超出名称列表时用编号本身作为名称"""
+    return names[class_id] if names is not None and 0 <= class_id < len(names) else str(class_id)
+
+
+def write_yolo(labels, path, options):
+    """写出 YOLO txt：中心点与宽高按图片尺寸归一化"""
+    mins, maxs = labels.boxes[:, :2], labels.boxes[:, 2:]
+    size = np.array([labels.width, labels.height], dtype=np.float64)
+    # 运算顺序与 json2txt_v2 一致，保证输出逐字节相同
+    centers = (mins + maxs) / 2.0 / size
+    sizes = (maxs - mins) / size
+    with open(path, 'w', encoding='utf-8') as f:
+        for class_id, (cx, cy), (w, h) in zip(labels.class_ids.tolist(), centers.tolist(), sizes.tolist()):
+            f.write(f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n")
+
+
+def voc_boxes(boxes, width, height):
+    """像素坐标四舍五入为整数并限制在图片范围内，返回 (N, 4) 整数数组"""
+    boxes = np.rint(boxes).astype(np.int64)
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+    return boxes
+
+
+def write_voc_file(path, filename, width, height, objects, depth=3):
+    """
+    逐段写出 Pascal VOC xml，不在内存中构造整棵 xml 树。
+    objects 为 (类别名称, xmin, ymin, xmax, ymax) 的可迭代对象。
+    """
+    folder = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<annotation>\n")
+        f.write(f"\t<folder>{escape(folder)}</folder>\n")
+        f.write(f"\t<filename>{escape(filename)}</filename>\n")
+        f.write("\t<size>\n")
+        f.write(f"\t\t<width>{width}</width>\n")
+        f.write(f"\t\t<height>{height}</height>\n")
+        f.write(f"\t\t<depth>{depth}</depth>\n")
+        f.write("\t</size>\n")
+        f.write("\t<segmented>0</segmented>\n")
+        for name, x1, y1, x2, y2 in objects:
+            f.write("\t<object>\n")
+            f.write(f"\t\t<name>{escape(name)}</name>\n")
+            f.write("\t\t<pose>Unspecified</pose>\n")
+            f.write("\t\t<truncated>0</truncated>\n")
+            f.write("\t\t<difficult>0</difficult>\n")
+            f.write("\t\t<bndbox>\n")
+            f.write(f"\t\t\t<xmin>{x1}</xmin>\n")
+            f.write(f"\t\t\t<ymin>{y1}</ymin>\n")
+            f.write(f"\t\t\t<xmax>{x2}</xmax>\n")
+            f.write(f"\t\t\t<ymax>{y2}</ymax>\n")
+            f.write("\t\t</bndbox>\n")
+            f.write("\t</object>\n")
+        f.write("</annotation>\n")
+
+
+def write_voc(labels, path, options):
+    """写出 Pascal VOC xml"""
+    names = options.get('names')
+    boxes = voc_boxes(labels.boxes, labels.width, labels.height)
+    objects = ((class_name(class_id, names), *box)
+               for class_id, box in zip(labels.class_ids.tolist(), boxes.tolist()))
+    write_voc_file(path, labels.filename, labels.width, labels.height, objects)
+
+
+def write_labelme(labels, path, options):
+    """写出 labelme json，每个检测框为一个矩形标注，不包含 imageData"""
+    names = options.get('names')
+    data = {
+        "version": "5.0.1",
+        "flags": {},
+        "shapes": [{"label": class_name(class_id, names),
+                    "points": [[x1, y1], [x2, y2]],
+                    "group_id": None,
+                    "shape_type": "rectangle",
+                    "flags": {}}
+                   for class_id, (x1, y1, x2, y2) in zip(labels.class_ids.tolist(), labels.boxes.tolist())],
+        "imagePath": labels.filename,
+        "imageData": None,
+        "imageHeight": labels.height,
+        "imageWidth": labels.width,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# 格式名 -> (读取函数, 写出函数, 文件后缀)
+FORMATS = {
+    'labelme': (read_labelme, write_labelme, '.json'),
+    'yolo': (read_yolo, write_yolo, '.txt'),
+    'voc': (read_voc, write_voc, '.xml'),
+}
+
+# 汇总报告中各类警告的说明
+WARNING_KINDS = {
+    'unknown_label': "未在类别映射中找到标签，跳过该标注",
+    'few_points': "标注点数不足或缺少检测框，跳过该标注",
+    'bad_line': "YOLO 标注行格式错误，跳过该行",
+    'error': "读取或转换失败，跳过该文件",
+}
+
+
+# ---------------------------- 文件夹转换 ----------------------------
+
+def convert_file(src_path, dst_path, src_format, dst_format, options, warnings):
+    """转换单个文件，警告以 (类型, 文件, 说明) 的形式追加到 warnings，返回是否生成了输出文件"""
+    reader = FORMATS[src_format][0]
+    writer = FORMATS[dst_format][1]
+    try:
+        labels = reader(src_path, options, lambda kind, detail: warnings.append((kind, src_path, detail)))
+        writer(labels, dst_path, options)
+    except Exception as e:
+        warnings.append(('error', src_path, str(e)))
+        return False
+    return True
+
+
+def _convert_chunk(pairs, src_format, dst_format, options):
+    """子进程入口：转换一块文件，返回 (成功数, 警告列表)"""
+    warnings = []
+    converted = sum(convert_file(src, dst, src_format, dst_format, options, warnings) for src, dst in pairs)
+    return converted, warnings
+
+
+def collect_image_paths(image_dir):
+    """图片文件夹中 主文件名 -> 图片路径"""
+    return {stem: os.path.join(image_dir, names[0])
+            for stem, names in build_stem_index(image_dir, extensions=IMAGE_EXTENSIONS).items()}
+
+
+def convert_folder(input_dir, output_dir, src_format, dst_format, label_mapping=None, image_dir=None,
+                   shape_mode='rect', workers=0, chunk_size=256):
+    """
+    转换文件夹中所有 src_format 格式的标注文件，返回 (成功数, 警告列表)。
+    label_mapping 为 {类别名: 编号}：读取 labelme/VOC 时必须提供，每个编号只能对应一个类别名；
+    读取 YOLO 时可省略，类别名称取自输入文件夹中的 classes.txt。
+    读取 YOLO 时需要 image_dir 以得到图片尺寸。workers 大于 0 时按 chunk_size 分块多进程转换。
+    """
+    src_ext = FORMATS[src_format][2]
+    dst_ext = FORMATS[dst_format][2]
+    if src_format != 'yolo' and label_mapping is None:
+        raise ValueError(f"读取 {src_format} 格式需要提供类别映射")
+    if src_format == 'yolo' and image_dir is None:
+        raise ValueError("读取 YOLO 格式需要提供图片文件夹以得到图片尺寸")
+
+    if label_mapping is not None:
+        names = class_names_from_mapping(label_mapping)
+    else:
+        names = load_class_names(input_dir)
+    options = {
+        'label_mapping': label_mapping,
+        'names': names,
+        'shape_mode': shape_mode,
+        'image_paths': collect_image_paths(image_dir) if src_format == 'yolo' else {},
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    pairs = [(os.path.join(input_dir, name), os.path.join(output_dir, os.path.splitext(name)[0] + dst_ext))
+             for name in sorted(os.listdir(input_dir))
+             if name.lower().endswith(src_ext) and name != CLASSES_FILE]
+
+    converted, warnings = 0, []
+    if workers <= 0:
+        for src, dst in pairs:
+            converted += convert_file(src, dst, src_format, dst_format, options, warnings)
+    else:
+        for chunk_converted, chunk_warnings in map_chunks(_convert_chunk, pairs, workers, chunk_size,
+                                                          (src_format, dst_format, options)):
+            converted += chunk_converted
+            warnings.extend(chunk_warnings)
+
+    if dst_format == 'yolo' and names:
+        with open(os.path.join(output_dir, CLASSES_FILE), 'w', encoding='utf-8') as f:
+            f.write("\n".join(names) + "\n")
+    return converted, warnings
+
+
+def main(input_dir, output_dir, src_format, dst_format, map=None, image_dir=None, workers=0):
+    if not os.path.isdir(input_dir):
+        print(f"错误: {input_dir} 不是有效的文件夹路径。")
+        return
+    if image_dir is not None and not os.path.isdir(image_dir):
+        print(f"错误: {image_dir} 不是有效的文件夹路径。")
+        return
+    try:
+        converted, warnings = convert_folder(input_dir, output_dir, src_format, dst_format, map, image_dir,
+                                             workers=workers)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
+    print_warning_report(warnings, WARNING_KINDS)
+    print(f"转换完成：{src_format} -> {dst_format}，共生成 {converted} 个文件，输出文件夹：{output_dir}")
+
+
+if __name__ == "__main__":
+    # 标注文件夹路径
+    input_dir = "C:/Users/Desktop/dataset/labels"
+    # 输出文件夹路径
+    output_dir = "C:/Users/Desktop/dataset/xml"
+    # 图片文件夹路径（读取 YOLO 格式时需要）
+    image_dir = "C:/Users/Desktop/dataset/images"
+    # 类别映射，读取 YOLO 格式时可为 None（使用 classes.txt）
+    label_mapping = {'line': 0, 'car': 1}
+    main(input_dir, output_dir, 'yolo', 'voc', label_mapping, image_dir)
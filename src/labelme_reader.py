@@ -0,0 +1,91 @@
+"""
+v1.0
+labelme json 的快速读取，供 json2txt_v1、json2txt_v2、json2xml 等共用。
+labelme 会把整张图片以 base64 存在 imageData 字段中，体积往往是标注本身的成百上千倍，
+而转换只需要 imageWidth、imageHeight 和 shapes。
+这里按块读取文件，遇到 imageData 的字符串值时直接跳过，不会构造这段字符串，
+解析结果中 imageData 为 None。安装了 orjson 时自动使用 orjson 解析（可选）。
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 每次读取的字节数
+CHUNK_SIZE = 1 << 20
+
+_KEY = b'"imageData"'
+
+
+def _read_without_image_data(f, chunk_size=CHUNK_SIZE):
+    """
+    按块读取二进制文件对象 f，返回把 imageData 的字符串值替换为 null 之后的字节串。
+    base64 中不含引号与反斜杠，因此值的结束位置就是下一个引号。
+    状态：0 查找键名，1 键名之后等待冒号与值，2 跳过字符串值。
+    """
+    parts = []
+    state, colon_seen = 0, False
+    tail = b''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        data = tail + chunk
+        tail = b''
+        pos = 0
+        while pos < len(data):
+            if state == 0:
+                idx = data.find(_KEY, pos)
+                if idx < 0:
+                    # 末尾可能是被块边界截断的键名前缀，留到下一块再判断
+                    cut = max(pos, len(data) - len(_KEY) + 1)
+                    parts.append(data[pos:cut])
+                    tail = data[cut:]
+                    pos = len(data)
+                else:
+                    parts.append(data[pos:idx + len(_KEY)])
+                    pos = idx + len(_KEY)
+                    state, colon_seen = 1, False
+            elif state == 1:
+                c = data[pos:pos + 1]
+                if c in b' \t\r\n' or (c == b':' and not colon_seen):
+                    colon_seen = colon_seen or c == b':'
+                    parts.append(c)
+                    pos += 1
+                elif c == b'"' and colon_seen:
+                    parts.append(b'null')
+                    pos += 1
+                    state = 2
+                else:
+                    # 不是 "imageData": "..." 的形式（例如值为 null），照常保留
+                    state = 0
+            else:
+                idx = data.find(b'"', pos)
+                if idx < 0:
+                    pos = len(data)
+                else:
+                    pos = idx + 1
+                    state = 0
+    parts.append(tail)
+    return b''.join(parts)
+
+
+def load_labelme(json_path, encoding='utf-8'):
+    """
+    读取 labelme json 文件并返回字典，imageData 字段为 None。
+    快速路径解析失败时退回标准的 json.load，结果与完整解析一致（除 imageData 外）。
+    """
+    with open(json_path, 'rb') as f:
+        raw = _read_without_image_data(f)
+    try:
+        if orjson is not None and encoding.lower().replace('-', '').replace('_', '') == 'utf8':
+            return orjson.loads(raw)
+        return json.loads(raw.decode(encoding))
+    except ValueError:
+        with open(json_path, 'r', encoding=encoding) as f:
+            data = json.load(f)
+        if isinstance(data, dict) and 'imageData' in data:
+            data['imageData'] = None
+        return data
@@ -0,0 +1,75 @@
+"""
+v1.1
+文件夹的 主文件名 -> 文件名列表 索引，供 CompareFolders、GenerationEmpty、DatasetSplit 等按同名文件配对的功能共用。
+每个文件夹只用 os.scandir 读取一次目录，之后的查找都是字典操作，
+不再对每个文件重新 listdir 或 os.path.exists，图片与标注各有几十万个文件时也只需各读一次目录。
+各工具生成的缓存与报告统一保存在被处理文件夹下的 .cache 子文件夹中（见 cache_path），扫描时跳过该子文件夹。
+
+v1.1: 递归扫描时记录已进入的目录（设备号与 inode），指向上级目录的符号链接形成环时不再无限递归
+"""
+import os
+
+# 缓存与报告所在的子文件夹名
+CACHE_DIR = '.cache'
+
+
+def cache_path(folder, name):
+    """
+    缓存文件路径：<文件夹>/.cache/<name>。
+    放在文件夹内部而不是旁边，不会写到上级目录，文件夹为磁盘根目录时也是合法路径；
+    iter_files 递归扫描时跳过 .cache，两个文件夹嵌套时缓存也不会被当作数据。
+    """
+    return os.path.join(folder, CACHE_DIR, name)
+
+
+def normalize_extensions(extensions):
+    """把 'jpg'、'.JPG' 等写法统一为小写并带点的后缀集合，None 表示不过滤"""
+    if extensions is None:
+        return None
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    return {('.' + ext.lstrip('.')).lower() for ext in extensions}
+
+
+def iter_files(folder, recursive=False, extensions=None):
+    """
+    逐个产出文件夹中的文件，返回 (相对路径, 主文件名)。
+    recursive 为 True 时包含子文件夹（缓存文件夹 .cache 除外）；extensions 为后缀列表时只产出这些后缀的文件（不区分大小写）。
+    指向文件夹的符号链接会被跟随，但同一个目录（按设备号与 inode 判断）只进入一次，链接成环时不会无限递归。
+    """
+    extensions = normalize_extensions(extensions)
+    root = os.stat(folder)
+    visited = {(root.st_dev, root.st_ino)}
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(folder, rel_dir)) as it:
+            for entry in it:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_dir():
+                    if recursive and entry.name != CACHE_DIR:
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        if (st.st_dev, st.st_ino) not in visited:
+                            visited.add((st.st_dev, st.st_ino))
+                            stack.append(rel_path)
+                    continue
+                if not entry.is_file():
+                    continue
+                stem, ext = os.path.splitext(entry.name)
+                if extensions is not None and ext.lower() not in extensions:
+                    continue
+                yield rel_path, stem
+
+
+def build_stem_index(folder, recursive=False, extensions=None):
+    """
+    返回 {主文件名: [相对路径, ...]}，同一主文件名的多个文件（如 a.jpg 与 a.png）按目录读取顺序排列。
+    参数含义同 iter_files。
+    """
+    index = {}
+    for rel_path, stem in iter_files(folder, recursive, extensions):
+        index.setdefault(stem, []).append(rel_path)
+    return index